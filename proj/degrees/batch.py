@@ -0,0 +1,131 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import degrees
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Answer many degrees queries with a single load.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("queries", nargs="?", default="-",
+                        help="CSV of source,target names or ids (default: stdin)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="size of the process pool")
+    parser.add_argument("--chunksize", type=int, default=64)
+    parser.add_argument("--cache-mb", type=float, default=256,
+                        help="memory ceiling for cached BFS trees per process")
+    parser.add_argument("--hot", type=int, default=3,
+                        help="queries from a source before its tree is cached")
+    parser.add_argument("--tree", action="append", default=[],
+                        help="preload a tree written by --single-source")
+    parser.add_argument("--single-source", metavar="NAME",
+                        help="write the BFS tree of NAME to --output and exit")
+    parser.add_argument("--output", help="tree file for --single-source")
+    args = parser.parse_args()
+
+    degrees.trees.max_bytes = int(args.cache_mb * 2**20)
+    degrees.trees.hot = args.hot
+
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(args.directory)
+    print("Data loaded.", file=sys.stderr)
+
+    if args.single_source is not None:
+        source = resolve(args.single_source)
+        if source is None or args.output is None:
+            sys.exit("--single-source needs a known person and --output.")
+        degrees.precompute(source).save(args.output)
+        return
+    for filename in args.tree:
+        degrees.load_tree(filename)
+
+    if args.queries == "-":
+        queries = sys.stdin
+    else:
+        queries = open(args.queries, encoding="utf-8", newline="")
+
+    count = 0
+    start = time.perf_counter()
+    with queries:
+        pairs = (row for row in csv.reader(queries) if row)
+        for line in answer(pairs, args.directory, args.workers, args.chunksize):
+            print(line)
+            count += 1
+    elapsed = time.perf_counter() - start
+
+    rate = count / elapsed if elapsed else 0
+    print(f"{count} queries in {elapsed:.3f}s ({rate:.1f} queries/s)",
+          file=sys.stderr)
+
+
+def answer(pairs, directory, workers, chunksize):
+    """
+    Yields one JSON line per (source, target) pair, in input order.
+
+    With more than one worker, queries are spread over a process pool.
+    Forked workers share the already loaded graph copy-on-write; where
+    fork is unavailable each worker loads `directory` itself.
+    """
+    if workers <= 1:
+        yield from map(solve, pairs)
+        return
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+        initargs = (None,)
+    else:
+        context = multiprocessing.get_context()
+        initargs = (directory,)
+    with context.Pool(workers, initializer=init_worker, initargs=initargs) as pool:
+        yield from pool.imap(solve, pairs, chunksize)
+
+
+def init_worker(directory):
+    if directory is not None:
+        degrees.load_data(directory)
+
+
+def solve(pair):
+    """
+    Returns the JSON result line for one query row.
+    """
+    if len(pair) != 2:
+        return json.dumps({"query": pair, "error": "expected source,target"})
+    source_name, target_name = (field.strip() for field in pair)
+    result = {"source": source_name, "target": target_name}
+
+    source = resolve(source_name)
+    target = resolve(target_name)
+    if source is None or target is None:
+        result["error"] = "person not found or ambiguous"
+        return json.dumps(result)
+
+    path = degrees.shortest_path(source, target, bidirectional=True)
+    if path is None:
+        result["degrees"] = None
+    else:
+        result["degrees"] = len(path)
+        result["path"] = path
+    return json.dumps(result)
+
+
+def resolve(name):
+    """
+    Returns the person_id for an id or an unambiguous name, else None.
+    """
+    if name in degrees.people:
+        return name
+    person_ids = degrees.names.get(name.lower(), set())
+    if len(person_ids) == 1:
+        return next(iter(person_ids))
+    return None
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import csv
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import degrees
+from graph import Graph
+from nameindex import NameIndex
+
+
+QUERIES = 100
+
+
+def load(directory):
+    """
+    Replaces whatever dataset degrees currently holds with `directory`.
+    Returns bytes allocated for the dicts and for the compact graph.
+    """
+    degrees.trees.hot = float("inf")
+
+    tracemalloc.start()
+    degrees.load_data(directory, index=False)
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    degrees.graph = Graph.from_dicts(degrees.people, degrees.movies, degrees.stats)
+    degrees.graph.person_index, degrees.graph.movie_index
+    graph_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    degrees.load_landmarks(directory)
+    degrees.name_index = NameIndex.build(
+        [degrees.people[p]["name"] for p in degrees.graph.person_ids])
+    return dict_bytes, graph_bytes
+
+
+def sample_pairs(n, seed=0):
+    """
+    Returns `n` random (source, target) person_id pairs.
+    """
+    rng = random.Random(seed)
+    person_ids = sorted(degrees.people)
+    return [(rng.choice(person_ids), rng.choice(person_ids)) for _ in range(n)]
+
+
+def run(pairs, **kwargs):
+    """
+    Runs shortest_path over `pairs` and returns
+    (path lengths, nodes expanded, edges scanned, seconds).
+    """
+    lengths = []
+    degrees.stats["expanded"] = degrees.stats["edges"] = 0
+    start = time.perf_counter()
+    for source, target in pairs:
+        path = degrees.shortest_path(source, target, **kwargs)
+        lengths.append(None if path is None else len(path))
+    elapsed = time.perf_counter() - start
+    return lengths, degrees.stats["expanded"], degrees.stats["edges"], elapsed
+
+
+def estimate(directory, pairs, lengths):
+    """
+    Reports how close landmark estimates come to the exact degrees.
+    """
+    start = time.perf_counter()
+    estimates = [degrees.estimate_degrees(source, target) for source, target in pairs]
+    elapsed = time.perf_counter() - start
+
+    known = [(e, l) for e, l in zip(estimates, lengths) if e is not None and l is not None]
+    exact = sum(e == l for e, l in known)
+    error = sum(e - l for e, l in known) / len(known) if known else 0
+    print(f"{directory:<12}landmark estimate: {exact}/{len(known)} exact, "
+          f"mean overestimate {error:.2f}, "
+          f"{elapsed / QUERIES * 1e6:.0f} us/query "
+          f"(k = {len(degrees.landmarks.people)})")
+
+
+def misspell(name, rng):
+    """
+    Returns `name` with one random deletion, substitution, insertion
+    or transposition.
+    """
+    i = rng.randrange(len(name))
+    letter = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    edit = rng.randrange(4)
+    if edit == 0:
+        return name[:i] + name[i + 1:]
+    if edit == 1:
+        return name[:i] + letter + name[i + 1:]
+    if edit == 2:
+        return name[:i] + letter + name[i:]
+    return name[:i] + name[i + 1:i + 2] + name[i:i + 1] + name[i + 2:]
+
+
+def fuzzy_names(directory, seed=0):
+    """
+    Reports recall and latency of name suggestions for misspelled names.
+    """
+    rng = random.Random(seed)
+    person_ids = sorted(degrees.people)
+    queries = []
+    for _ in range(QUERIES):
+        person_id = rng.choice(person_ids)
+        queries.append((misspell(degrees.people[person_id]["name"], rng), person_id))
+
+    top1 = top5 = 0
+    start = time.perf_counter()
+    for query, person_id in queries:
+        suggestions = degrees.suggest_names(query, 5)
+        names = [degrees.people[p]["name"].lower() for p in suggestions]
+        name = degrees.people[person_id]["name"].lower()
+        top1 += names[:1] == [name]
+        top5 += name in names
+    elapsed = time.perf_counter() - start
+    print(f"{directory:<12}misspelled names: top-1 {top1}/{QUERIES}, "
+          f"top-5 {top5}/{QUERIES}, {elapsed / QUERIES * 1e6:.0f} us/query")
+
+
+def legacy_load(directory):
+    """
+    The original csv.DictReader loader, kept as the load-time baseline.
+    """
+    names, people, movies = {}, {}, {}
+    with open(f"{directory}/people.csv", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            people[row["id"]] = {"name": row["name"], "birth": row["birth"], "movies": set()}
+            names.setdefault(row["name"].lower(), set()).add(row["id"])
+    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            movies[row["id"]] = {"title": row["title"], "year": row["year"], "stars": set()}
+    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            try:
+                people[row["person_id"]]["movies"].add(row["movie_id"])
+                movies[row["movie_id"]]["stars"].add(row["person_id"])
+            except KeyError:
+                pass
+    return names, people, movies
+
+
+def load_child(loader, directory):
+    """
+    Runs one loader and prints its wall time and peak RSS as JSON.
+    """
+    start = time.perf_counter()
+    if loader == "legacy":
+        _, people, movies = legacy_load(directory)
+        graph = Graph.from_dicts(people, movies)
+        NameIndex.build([people[p]["name"] for p in graph.person_ids])
+    else:
+        degrees.load_data(directory, cache=loader == "snapshot")
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is in KiB on Linux
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"seconds": elapsed, "rss_mib": rss}))
+
+
+def compare_loads(directories):
+    """
+    Reports load wall time and peak RSS of the original loader (plus
+    building the graph and name index) against load_data from the CSVs
+    and from a warm snapshot, each in a fresh process.
+    """
+    print(f"{'dataset':<12}{'loader':<10}{'seconds':>9}{'peak MiB':>10}")
+    for directory in directories:
+        # A first load writes the snapshot that the snapshot row reads
+        subprocess.run([sys.executable, __file__, "--load-child", "snapshot", directory],
+                       check=True, capture_output=True)
+        for loader in ("legacy", "stream", "snapshot"):
+            output = subprocess.run(
+                [sys.executable, __file__, "--load-child", loader, directory],
+                check=True, capture_output=True, text=True).stdout
+            result = json.loads(output.splitlines()[-1])
+            print(f"{directory:<12}{loader:<10}{result['seconds']:>9.2f}"
+                  f"{result['rss_mib']:>10.1f}")
+
+
+def main():
+    if sys.argv[1:2] == ["--load-child"]:
+        return load_child(*sys.argv[2:4])
+    if sys.argv[1:2] == ["--load"]:
+        return compare_loads(sys.argv[2:] or ["small", "large"])
+    directories = sys.argv[1:] or ["small", "large"]
+
+    print(f"{'dataset':<12}{'layout':<8}{'mode':<15}{'expanded':>10}"
+          f"{'seconds':>9}{'us/query':>10}{'edges/s':>12}")
+    for directory in directories:
+        dict_bytes, graph_bytes = load(directory)
+        pairs = sample_pairs(QUERIES)
+        graph = degrees.graph
+
+        results = []
+        for layout in ("dict", "csr"):
+            degrees.graph = graph if layout == "csr" else None
+            modes = ["bfs", "bidirectional"]
+            if layout == "csr" and degrees.landmarks is not None:
+                modes.append("astar")
+            for mode in modes:
+                result = run(pairs, bidirectional=mode == "bidirectional",
+                             astar=mode == "astar")
+                results.append(result[0])
+                _, expanded, edges, elapsed = result
+                print(f"{directory:<12}{layout:<8}{mode:<15}{expanded:>10}"
+                      f"{elapsed:>9.3f}{elapsed / QUERIES * 1e6:>10.0f}"
+                      f"{edges / elapsed if elapsed else 0:>12.0f}")
+        if any(lengths != results[0] for lengths in results):
+            sys.exit("Path lengths differ between search modes.")
+
+        if degrees.landmarks is not None:
+            estimate(directory, pairs, results[0])
+        fuzzy_names(directory)
+        print(f"{directory:<12}memory: dicts {dict_bytes / 2**20:.1f} MiB, "
+              f"csr arrays {graph.nbytes() / 2**20:.1f} MiB "
+              f"({graph_bytes / 2**20:.1f} MiB with id maps)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,13 @@
-import csv
+import gc
 import sys
 
+import ingest
+import landmarks as landmark_index
+import records
+import snapshot
+from graph import Graph
+from nameindex import NameIndex
+from trees import SearchTree, TreeCache
 from util import Node, StackFrontier, QueueFrontier
 
 # Maps names to a set of corresponding person_ids
@@ -12,44 +19,139 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# With an index, load_data replaces these three dicts by read-only views
+# of the same records, built from the graph as they are looked up
 
-def load_data(directory):
+# Search counters, reset by callers that want to measure a query
+stats = {"expanded": 0, "edges": 0}
+
+# Integer CSR index over people and movies, built by load_data
+graph = None
+
+# BFS trees of frequently queried sources, keyed by graph index
+trees = TreeCache(256 * 2**20)
+
+# Optional landmark distance oracle, built offline by landmarks.py
+landmarks = None
+
+# Prefix/trigram index over names, built by load_data with the graph
+name_index = None
+
+
+def load_data(directory, index=True, cache=True):
     """
     Load data from CSV files into memory.
+    If `index` is set, also build the compact search graph, and make
+    names, people and movies read-only views over it instead of dicts.
+    If `cache` is set too, reuse (or write) a binary snapshot of the
+    parsed data, which is ignored once any CSV's mtime or size changes.
+    """
+    global graph, landmarks, name_index
+
+    trees.clear()
+    landmarks = None
+    cache = cache and index
+    # Loading allocates millions of long-lived containers; collecting
+    # cycles among them is wasted work
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        columns = snapshot.load(directory) if cache else None
+        if columns is None:
+            sources = snapshot.signature(directory) if cache else None
+            columns = ingest.read_columns(directory)
+            load_columns(columns, index)
+            if cache:
+                columns.update(name_index_columns())
+                snapshot.save(directory, sources, columns)
+        else:
+            load_columns(columns, index)
+    finally:
+        if collecting:
+            gc.enable()
+
+    if index:
+        load_landmarks(directory)
+    else:
+        graph = name_index = None
+
+
+def load_landmarks(directory):
     """
-    # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
-
-    # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
-
-    # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+    Loads the landmark index of `directory` if one was built for
+    its current CSVs.
+    """
+    global landmarks
+
+    landmarks = landmark_index.Landmarks.load(
+        landmark_index.path_for(directory), graph, snapshot.signature(directory))
+
+
+def name_index_columns():
+    """
+    Returns the name index as the columns stored in a snapshot.
+    """
+    return {
+        "name_keys": name_index.keys,
+        "key_offsets": name_index.key_offsets,
+        "key_people": name_index.key_people,
+        "trigrams": name_index.trigrams,
+        "trigram_offsets": name_index.trigram_offsets,
+        "trigram_keys": name_index.trigram_keys,
+    }
+
+
+def load_columns(columns, index=True):
+    """
+    Fills names, people, movies, graph and name_index from the columns
+    of a snapshot or of freshly parsed CSVs. With `index` set, names,
+    people and movies become views over the graph and the name index is
+    built if the columns do not hold one; otherwise they are filled as
+    dicts.
+    """
+    global graph, name_index, names, people, movies
+
+    graph = Graph(columns["person_ids"], columns["movie_ids"],
+                  columns["person_offsets"], columns["person_movies"],
+                  columns["movie_offsets"], columns["movie_people"], stats)
+    if "name_keys" in columns:
+        name_index = NameIndex(columns["name_keys"], columns["key_offsets"],
+                               columns["key_people"], columns["trigrams"],
+                               columns["trigram_offsets"], columns["trigram_keys"])
+    elif index:
+        name_index = NameIndex.build(columns["names"])
+
+    if index:
+        people = records.People(graph, columns["names"], columns["births"])
+        movies = records.Movies(graph, columns["titles"], columns["years"])
+        names = records.Names(graph, name_index)
+        return
+
+    person_ids, movie_ids = graph.person_ids, graph.movie_ids
+    movies_of, stars_of = graph.movies_of, graph.stars_of
+
+    people = {
+        person_id: {
+            "name": name,
+            "birth": birth,
+            "movies": set(map(movie_ids.__getitem__, movies_of(i)))
+        }
+        for i, (person_id, name, birth) in enumerate(
+            zip(person_ids, columns["names"], columns["births"]))
+    }
+    names = {}
+    for person_id, name in zip(person_ids, columns["names"]):
+        names.setdefault(name.lower(), set()).add(person_id)
+
+    movies = {
+        movie_id: {
+            "title": title,
+            "year": year,
+            "stars": set(map(person_ids.__getitem__, stars_of(i)))
+        }
+        for i, (movie_id, title, year) in enumerate(
+            zip(movie_ids, columns["titles"], columns["years"]))
+    }
 
 
 def main():
@@ -62,14 +164,16 @@ def main():
     load_data(directory)
     print("Data loaded.")
 
-    source = person_id_for_name(input("Name: "))
+    name = input("Name: ")
+    source = person_id_for_name(name)
     if source is None:
-        sys.exit("Person not found.")
-    target = person_id_for_name(input("Name: "))
+        sys.exit(not_found_message(name))
+    name = input("Name: ")
+    target = person_id_for_name(name)
     if target is None:
-        sys.exit("Person not found.")
+        sys.exit(not_found_message(name))
 
-    path = shortest_path(source, target)
+    path = shortest_path(source, target, bidirectional=True)
 
     if path is None:
         print("Not connected.")
@@ -84,41 +188,206 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, bidirectional=False, astar=False):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
+    If `bidirectional` is set, search from both ends at once.
+    If `astar` is set and landmarks are loaded, run A* instead.
     If no possible path, returns None.
     """
     if source == target: return []
+    if graph is not None:
+        source, target = graph.person_index[source], graph.person_index[target]
+        if astar and landmarks is not None:
+            path = landmarks.shortest_path(source, target)
+        else:
+            path = indexed_path(source, target, bidirectional)
+        return graph.to_ids(path)
+    if bidirectional:
+        return bidirectional_path(source, target)
 
     frontier = QueueFrontier()
-    frontier.add((source, None, None)) # (curr_people_id, father_state, movie_id)
+    frontier.add(Node(source, None, None))
 
-    path_visited = set() # (curr_people_id, prev_people_id, movie_id)
+    # person_id -> (movie_id, parent person_id); doubles as the visited set
+    parents = {source: None}
 
     while not frontier.empty():
-        state = frontier.remove()
-        nbrs = neighbors_for_person(state[0]) # (movie_id, people_id)
-        for nbr in nbrs:
-            if nbr[1] == state[0]: continue
-
-            if nbr[1] == target:
-                ret = [nbr]
-                while state[1] is not None:
-                    ret = [(state[2], state[0])] + ret
-                    state = state[1]
-                return ret
-            
-            if (nbr[1], state[0], nbr[0]) in path_visited: continue
-            path_visited.add((nbr[1], state[0], nbr[0]))
-            
-            frontier.add((nbr[1], state, nbr[0]))
+        node = frontier.remove()
+        stats["expanded"] += 1
+        for movie_id, person_id in neighbors_for_person(node.state):
+            stats["edges"] += 1
+            if person_id in parents:
+                continue
+            parents[person_id] = (movie_id, node.state)
+            if person_id == target:
+                return walk_parents(parents, target)
+            frontier.add(Node(person_id, node.state, movie_id))
 
     return None
 
 
+def estimate_degrees(source, target):
+    """
+    Returns an upper bound on the degrees of separation between two
+    people from the landmark index alone, without searching.
+    Returns None if no landmark index is loaded or no landmark reaches
+    both people.
+    """
+    if landmarks is None:
+        return None
+    return landmarks.estimate(graph.person_index[source], graph.person_index[target])
+
+
+def indexed_path(source, target, bidirectional=False):
+    """
+    Returns the shortest (movie, person) index path on the graph,
+    walking a cached BFS tree of either end when there is one.
+    Sources that are queried often get a tree built for them, if the
+    tree cache can keep it; otherwise they are searched as usual.
+    """
+    tree = trees.get(source)
+    if tree is not None:
+        return tree.path_to(target)
+    tree = trees.get(target)
+    if tree is not None:
+        return tree.path_from(source)
+    if trees.touch(source, SearchTree.nbytes_for(graph)):
+        tree = SearchTree.build(graph, source)
+        if trees.put(tree):
+            return tree.path_to(target)
+    return graph.shortest_path(source, target, bidirectional)
+
+
+def precompute(person_id):
+    """
+    Runs one BFS from `person_id` over the whole graph, caches the
+    resulting tree for later queries and returns it.
+    """
+    return precompute_index(graph.person_index[person_id])
+
+
+def precompute_index(source):
+    tree = SearchTree.build(graph, source)
+    trees.put(tree)
+    return tree
+
+
+def load_tree(filename):
+    """
+    Loads a tree written by SearchTree.save into the tree cache.
+    """
+    tree = SearchTree.load(filename, graph)
+    trees.put(tree)
+    return tree
+
+
+def bidirectional_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, growing one BFS layer
+    at a time from whichever side has the smaller frontier.
+
+    If no possible path, returns None.
+    """
+    if source == target: return []
+
+    # person_id -> (movie_id, person_id one step closer to that side's root)
+    forward = {source: None}
+    backward = {target: None}
+    forward_layer = [source]
+    backward_layer = [target]
+
+    while forward_layer and backward_layer:
+        if len(forward_layer) <= len(backward_layer):
+            layer, seen, other = forward_layer, forward, backward
+        else:
+            layer, seen, other = backward_layer, backward, forward
+
+        # Finish the whole layer so the first meeting found is a shortest one
+        meet = None
+        next_layer = []
+        for person_id in layer:
+            stats["expanded"] += 1
+            for movie_id, nbr in neighbors_for_person(person_id):
+                stats["edges"] += 1
+                if nbr in seen:
+                    continue
+                seen[nbr] = (movie_id, person_id)
+                next_layer.append(nbr)
+                if meet is None and nbr in other:
+                    meet = nbr
+        if meet is not None:
+            return join_paths(forward, backward, meet)
+
+        if seen is forward:
+            forward_layer = next_layer
+        else:
+            backward_layer = next_layer
+
+    return None
+
+
+def walk_parents(parents, person_id):
+    """
+    Returns the (movie_id, person_id) path from the root of
+    `parents` down to `person_id`.
+    """
+    path = []
+    while parents[person_id] is not None:
+        movie_id, prev = parents[person_id]
+        path.append((movie_id, person_id))
+        person_id = prev
+    path.reverse()
+    return path
+
+
+def join_paths(forward, backward, meet):
+    """
+    Builds the (movie_id, person_id) path through `meet` from the
+    parent maps of a bidirectional search.
+    """
+    path = walk_parents(forward, meet)
+    person_id = meet
+    while backward[person_id] is not None:
+        movie_id, person_id = backward[person_id]
+        path.append((movie_id, person_id))
+    return path
+
+
+def within_degrees(person_id, k):
+    """
+    Yields (person_id, degrees) for everyone within `k` degrees of
+    `person_id`, nearest first, without building the whole list.
+    """
+    for person, depth in graph.neighbourhood(graph.person_index[person_id], k):
+        yield graph.person_ids[person], depth
+
+
+def shortest_path_counts(person_id, max_degrees=None):
+    """
+    Yields (person_id, degrees, count) for everyone connected to
+    `person_id`, layer by layer, where count is the number of shortest
+    (movie_id, person_id) paths that reach them.
+    """
+    for person, depth, count in graph.path_counts(graph.person_index[person_id],
+                                                  max_degrees):
+        yield graph.person_ids[person], depth, count
+
+
+def count_shortest_paths(source, target):
+    """
+    Returns (degrees, number of shortest paths) between two people,
+    or None if they are not connected.
+    """
+    for person_id, depth, count in shortest_path_counts(source):
+        if person_id == target:
+            return depth, count
+    return None
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
@@ -145,6 +414,28 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def suggest_names(name, limit=5):
+    """
+    Returns up to `limit` person_ids whose names are the closest
+    prefix or fuzzy matches for `name`, best first.
+    """
+    if name_index is None:
+        return []
+    return [graph.person_ids[p] for p in name_index.candidates(name, limit)]
+
+
+def not_found_message(name):
+    """
+    Returns the error for an unknown `name`, listing close matches.
+    """
+    suggestions = suggest_names(name)
+    if not suggestions:
+        return "Person not found."
+    return "Person not found. Did you mean:\n" + "\n".join(
+        f"  ID: {p}, Name: {people[p]['name']}, Birth: {people[p]['birth']}"
+        for p in suggestions)
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
@@ -0,0 +1,232 @@
+from array import array
+from functools import cached_property
+
+
+class Graph():
+    """
+    Compact person/movie index used by the search code.
+
+    People and movies are numbered 0..n-1. Links are stored CSR-style:
+    the movies of person `p` are `person_movies[person_offsets[p]:
+    person_offsets[p + 1]]`, and likewise for the stars of a movie.
+    """
+
+    def __init__(self, person_ids, movie_ids, person_offsets, person_movies,
+                 movie_offsets, movie_people, stats=None):
+        self.person_ids = person_ids
+        self.movie_ids = movie_ids
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+        self.stats = stats if stats is not None else {"expanded": 0, "edges": 0}
+
+    @classmethod
+    def from_dicts(cls, people, movies, stats=None):
+        """
+        Builds the index from the `people` and `movies` dicts of degrees.
+        """
+        person_ids = list(people)
+        movie_ids = list(movies)
+        person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+
+        person_offsets = array("i", [0])
+        person_movies = array("i")
+        for person_id in person_ids:
+            person_movies.extend(movie_index[m] for m in people[person_id]["movies"])
+            person_offsets.append(len(person_movies))
+
+        movie_offsets = array("i", [0])
+        movie_people = array("i")
+        for movie_id in movie_ids:
+            movie_people.extend(person_index[p] for p in movies[movie_id]["stars"])
+            movie_offsets.append(len(movie_people))
+
+        return cls(person_ids, movie_ids, person_offsets, person_movies,
+                   movie_offsets, movie_people, stats)
+
+    @cached_property
+    def person_index(self):
+        """
+        Maps person_ids to person numbers, built on first use.
+        """
+        return dict(zip(self.person_ids, range(len(self.person_ids))))
+
+    @cached_property
+    def movie_index(self):
+        """
+        Maps movie_ids to movie numbers, built on first use.
+        """
+        return dict(zip(self.movie_ids, range(len(self.movie_ids))))
+
+    def nbytes(self):
+        """
+        Returns the number of bytes held by the link arrays.
+        """
+        return sum(a.buffer_info()[1] * a.itemsize for a in (
+            self.person_offsets, self.person_movies,
+            self.movie_offsets, self.movie_people
+        ))
+
+    def movies_of(self, person):
+        return self.person_movies[self.person_offsets[person]:self.person_offsets[person + 1]]
+
+    def stars_of(self, movie):
+        return self.movie_people[self.movie_offsets[movie]:self.movie_offsets[movie + 1]]
+
+    def expand(self, layer, parents, seen_movies, target=None):
+        """
+        Expands every person in `layer` once and returns the people
+        discovered, recording (movie, person) parents for each of them.
+        Stops early once `target` has been discovered.
+
+        A movie only needs to be expanded once per search: every star
+        reached through it later would be reached at a greater depth.
+        """
+        stats = self.stats
+        movies_of = self.movies_of
+        stars_of = self.stars_of
+        next_layer = []
+        for person in layer:
+            stats["expanded"] += 1
+            for movie in movies_of(person):
+                if movie in seen_movies:
+                    continue
+                seen_movies.add(movie)
+                stars = stars_of(movie)
+                stats["edges"] += len(stars)
+                for star in stars:
+                    if star not in parents:
+                        parents[star] = (movie, person)
+                        next_layer.append(star)
+                        if star == target:
+                            return next_layer
+        return next_layer
+
+    def shortest_path(self, source, target, bidirectional=False):
+        """
+        Returns the shortest list of (movie, person) index pairs that
+        connect person `source` to person `target`, or None.
+        """
+        if source == target:
+            return []
+        if bidirectional:
+            return self.bidirectional_path(source, target)
+
+        parents = {source: None}
+        seen_movies = set()
+        layer = [source]
+        while layer:
+            layer = self.expand(layer, parents, seen_movies, target)
+            if target in parents:
+                return walk(parents, target)
+        return None
+
+    def bidirectional_path(self, source, target):
+        """
+        Like `shortest_path`, but grows whole BFS layers from both ends,
+        always expanding the side with the smaller frontier.
+        """
+        forward, backward = {source: None}, {target: None}
+        forward_movies, backward_movies = set(), set()
+        forward_layer, backward_layer = [source], [target]
+
+        while forward_layer and backward_layer:
+            if len(forward_layer) <= len(backward_layer):
+                forward_layer = self.expand(forward_layer, forward, forward_movies)
+                layer, other = forward_layer, backward
+            else:
+                backward_layer = self.expand(backward_layer, backward, backward_movies)
+                layer, other = backward_layer, forward
+
+            for person in layer:
+                if person in other:
+                    path = walk(forward, person)
+                    while backward[person] is not None:
+                        movie, person = backward[person]
+                        path.append((movie, person))
+                    return path
+
+        return None
+
+    def neighbourhood(self, source, k):
+        """
+        Yields (person, distance) for everyone within `k` degrees of
+        person `source`, nearest first, as they are discovered.
+        """
+        movies_of, stars_of = self.movies_of, self.stars_of
+        visited = {source}
+        seen_movies = set()
+        layer = [source]
+        for depth in range(1, k + 1):
+            next_layer = []
+            for person in layer:
+                for movie in movies_of(person):
+                    if movie in seen_movies:
+                        continue
+                    seen_movies.add(movie)
+                    for star in stars_of(movie):
+                        if star not in visited:
+                            visited.add(star)
+                            next_layer.append(star)
+                            yield star, depth
+            if not next_layer:
+                return
+            layer = next_layer
+
+    def path_counts(self, source, max_depth=None):
+        """
+        Yields (person, distance, count) for every person reachable from
+        `source` within `max_depth` degrees, one BFS layer at a time,
+        where count is the number of distinct shortest (movie, person)
+        paths from `source` to that person.
+        """
+        movies_of, stars_of = self.movies_of, self.stars_of
+        visited = {source}
+        seen_movies = set()
+        counts = {source: 1}
+        depth = 0
+        yield source, 0, 1
+        while counts and (max_depth is None or depth < max_depth):
+            depth += 1
+
+            # A movie first reached from this layer carries the paths of
+            # every person of this layer in it; later layers skip it
+            movie_counts = {}
+            for person, count in counts.items():
+                for movie in movies_of(person):
+                    if movie not in seen_movies:
+                        movie_counts[movie] = movie_counts.get(movie, 0) + count
+            seen_movies.update(movie_counts)
+
+            counts = {}
+            for movie, count in movie_counts.items():
+                for star in stars_of(movie):
+                    if star not in visited:
+                        counts[star] = counts.get(star, 0) + count
+            visited.update(counts)
+            for person, count in counts.items():
+                yield person, depth, count
+
+    def to_ids(self, path):
+        """
+        Converts a path of index pairs into (movie_id, person_id) pairs.
+        """
+        if path is None:
+            return None
+        return [(self.movie_ids[movie], self.person_ids[person]) for movie, person in path]
+
+
+def walk(parents, person):
+    """
+    Returns the (movie, person) path from the root of `parents`
+    down to `person`.
+    """
+    path = []
+    while parents[person] is not None:
+        movie, prev = parents[person]
+        path.append((movie, person))
+        person = prev
+    path.reverse()
+    return path
@@ -0,0 +1,119 @@
+"""
+Streaming CSV ingestion for degrees.
+
+The CSVs are parsed in chunks with a plain csv.reader straight into
+column lists. Person and movie ids are interned into integers, and
+stars.csv is joined against those integers chunk by chunk into the
+CSR arrays used by Graph. The result has the same columns as a snapshot.
+"""
+
+import csv
+from array import array
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from itertools import accumulate, islice, repeat
+
+CHUNK = 65536
+
+
+def read_columns(directory):
+    """
+    Parses the three CSVs in `directory` and returns snapshot columns.
+    """
+    with ThreadPoolExecutor(2) as executor:
+        people = executor.submit(read_table, f"{directory}/people.csv",
+                                 ("id", "name", "birth"))
+        movies = executor.submit(read_table, f"{directory}/movies.csv",
+                                 ("id", "title", "year"))
+        person_ids, names, births = people.result()
+        movie_ids, titles, years = movies.result()
+
+    person_index = intern(person_ids)
+    movie_index = intern(movie_ids)
+    person_offsets, person_movies, movie_offsets, movie_people = read_stars(
+        f"{directory}/stars.csv", person_index, movie_index,
+        len(person_ids), len(movie_ids))
+
+    return {
+        "person_ids": person_ids,
+        "names": names,
+        "births": births,
+        "movie_ids": movie_ids,
+        "titles": titles,
+        "years": years,
+        "person_offsets": person_offsets,
+        "person_movies": person_movies,
+        "movie_offsets": movie_offsets,
+        "movie_people": movie_people,
+    }
+
+
+def chunks(filename, fields):
+    """
+    Yields the CSV file in chunks of rows, each chunk as one list per
+    field in `fields`.
+    """
+    with open(filename, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        positions = [header.index(field) for field in fields]
+        while True:
+            chunk = [row for row in islice(reader, CHUNK) if row]
+            if not chunk:
+                return
+            yield [[row[i] for row in chunk] for i in positions]
+
+
+def read_table(filename, fields):
+    """
+    Returns one list per field, holding that column of the CSV.
+    """
+    columns = [[] for _ in fields]
+    for chunk in chunks(filename, fields):
+        for column, values in zip(columns, chunk):
+            column.extend(values)
+    return columns
+
+
+def intern(ids):
+    """
+    Maps every id to its position in `ids`; a repeated id maps to its
+    last row, as it would overwrite earlier rows in a dict.
+    """
+    return {id: i for i, id in enumerate(ids)}
+
+
+def read_stars(filename, person_index, movie_index, n_people, n_movies):
+    """
+    Streams stars.csv into CSR arrays for both directions. Rows naming
+    unknown people or movies and repeated rows are skipped.
+    """
+    # Each link is stored once as the integer person * n_movies + movie
+    edges = set()
+    for person_ids, movie_ids in chunks(filename, ("person_id", "movie_id")):
+        edges.update(
+            person * n_movies + movie
+            for person, movie in zip(map(person_index.get, person_ids),
+                                     map(movie_index.get, movie_ids))
+            if person is not None and movie is not None
+        )
+
+    by_person = sorted(edges)
+    person_offsets = offsets([edge // n_movies for edge in by_person], n_people)
+    person_movies = array("i", [edge % n_movies for edge in by_person])
+    del by_person
+
+    by_movie = sorted((edge % n_movies) * n_people + edge // n_movies for edge in edges)
+    movie_offsets = offsets([edge // n_people for edge in by_movie], n_movies)
+    movie_people = array("i", [edge % n_people for edge in by_movie])
+    return person_offsets, person_movies, movie_offsets, movie_people
+
+
+def offsets(keys, n):
+    """
+    Returns CSR offsets for sorted `keys` in 0..n-1.
+    """
+    counts = Counter(keys)
+    result = array("i", [0])
+    result.extend(accumulate(map(counts.get, range(n), repeat(0))))
+    return result
@@ -0,0 +1,183 @@
+"""
+Landmark distance oracle for degrees.
+
+BFS distances from k high-degree people are kept as a k x n uint8
+matrix. By the triangle inequality, for any landmark l,
+|d(l, s) - d(l, t)| <= d(s, t) <= d(l, s) + d(l, t), which gives an
+admissible A* heuristic and an O(k) distance estimate.
+"""
+
+import heapq
+import os
+import struct
+import sys
+
+import snapshot
+from trees import SearchTree, UNREACHED
+
+MAGIC = b"DEGLMRK\0"
+VERSION = 1
+FILENAME = ".degrees-landmarks"
+HEADER = struct.Struct("<8sIii")
+SOURCE = struct.Struct("<qq")
+
+
+class Landmarks():
+
+    def __init__(self, graph, people, matrix):
+        self.graph = graph
+        self.people = people
+        self.matrix = matrix
+        self.n = len(graph.person_ids)
+
+    @classmethod
+    def build(cls, graph, k):
+        """
+        Picks the `k` people with the most co-star links and runs one
+        BFS from each of them.
+        """
+        n = len(graph.person_ids)
+        movie_sizes = [len(graph.stars_of(m)) for m in range(len(graph.movie_ids))]
+        degree = [sum(movie_sizes[m] - 1 for m in graph.movies_of(p)) for p in range(n)]
+        people = sorted(range(n), key=lambda p: (-degree[p], p))[:k]
+
+        matrix = bytearray()
+        for person in people:
+            matrix += SearchTree.build(graph, person).distance
+        return cls(graph, people, matrix)
+
+    def distances(self, person):
+        """
+        Returns the distance from every landmark to `person`.
+        """
+        return self.matrix[person::self.n]
+
+    def lower_bound(self, source, target):
+        """
+        Returns a lower bound on the degrees between two people,
+        or None if some landmark proves they are not connected.
+        """
+        bound = 0
+        for a, b in zip(self.distances(source), self.distances(target)):
+            if a == UNREACHED or b == UNREACHED:
+                if a != b:
+                    return None
+                continue
+            bound = max(bound, abs(a - b))
+        return bound
+
+    def estimate(self, source, target):
+        """
+        Returns the shortest route through any landmark, an upper
+        bound on the degrees between two people, in O(k). Returns None
+        if no landmark reaches both of them.
+        """
+        if source == target:
+            return 0
+        best = None
+        for a, b in zip(self.distances(source), self.distances(target)):
+            if a != UNREACHED and b != UNREACHED and (best is None or a + b < best):
+                best = a + b
+        return best
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest (movie, person) index path between two
+        people using A* with the landmark lower bound, or None.
+        """
+        if source == target:
+            return []
+        if self.lower_bound(source, target) is None:
+            return None
+
+        graph = self.graph
+        stats = graph.stats
+        cost = {source: 0}
+        parents = {source: None}
+        closed = set()
+        heap = [(self.lower_bound(source, target), 0, source)]
+        while heap:
+            _, g, person = heapq.heappop(heap)
+            g = -g
+            if person in closed:
+                continue
+            if person == target:
+                path = []
+                while parents[person] is not None:
+                    movie, prev = parents[person]
+                    path.append((movie, person))
+                    person = prev
+                path.reverse()
+                return path
+            closed.add(person)
+            stats["expanded"] += 1
+
+            g += 1
+            for movie in graph.movies_of(person):
+                stars = graph.stars_of(movie)
+                stats["edges"] += len(stars)
+                for star in stars:
+                    if star in closed or cost.get(star, g + 1) <= g:
+                        continue
+                    cost[star] = g
+                    parents[star] = (movie, person)
+                    # Prefer deeper nodes among equal f to reach the target sooner
+                    heapq.heappush(heap, (g + self.lower_bound(star, target), -g, star))
+        return None
+
+    def save(self, filename, sources):
+        with open(filename, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(self.people), self.n))
+            for source in sources:
+                f.write(SOURCE.pack(*source))
+            f.write(struct.pack(f"<{len(self.people)}i", *self.people))
+            f.write(self.matrix)
+
+    @classmethod
+    def load(cls, filename, graph, sources):
+        """
+        Reads landmarks written by `save`, or returns None if the file
+        is missing or was built from different CSVs.
+        """
+        try:
+            with open(filename, "rb") as f:
+                data = f.read()
+            magic, version, k, n = HEADER.unpack_from(data, 0)
+            pos = HEADER.size
+            stored = []
+            for _ in sources:
+                stored.append(SOURCE.unpack_from(data, pos))
+                pos += SOURCE.size
+            people = list(struct.unpack_from(f"<{k}i", data, pos))
+            pos += 4 * k
+        except (OSError, struct.error):
+            return None
+        if (magic != MAGIC or version != VERSION or tuple(stored) != tuple(sources) or
+                n != len(graph.person_ids) or len(data) - pos != k * n):
+            return None
+        return cls(graph, people, bytearray(data[pos:]))
+
+
+def path_for(directory):
+    return os.path.join(directory, FILENAME)
+
+
+def main():
+    import degrees
+
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python landmarks.py [directory] [k]")
+    directory = sys.argv[1] if len(sys.argv) > 1 else "large"
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+
+    print("Loading data...")
+    degrees.load_data(directory)
+    print(f"Building {k} landmarks...")
+    landmarks = Landmarks.build(degrees.graph, k)
+    landmarks.save(path_for(directory), snapshot.signature(directory))
+    for person in landmarks.people:
+        print(f"  {degrees.people[degrees.graph.person_ids[person]]['name']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Prefix and trigram index over lowercased person names.
+"""
+
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+# A single edit changes at most three trigrams, so a misspelled name
+# still shares at least one of any four of its trigrams with the query
+SEED_TRIGRAMS = 4
+
+# Trigrams shared by more names than this are not used to find
+# candidates, unless a query has nothing rarer to go on
+MAX_POSTINGS = 5000
+
+# How many of the best seed matches get an exact similarity score
+RESCORE = 50
+
+# Fuzzy matches less similar than this are not worth suggesting
+MIN_SIMILARITY = 0.25
+
+
+class NameIndex():
+    """
+    `keys` is the sorted list of distinct lowercased names, and
+    `key_people[key_offsets[i]:key_offsets[i + 1]]` the people with
+    name `keys[i]`. Trigram postings use the same offsets layout,
+    holding key numbers for each trigram in sorted `trigrams`.
+    """
+
+    def __init__(self, keys, key_offsets, key_people,
+                 trigrams, trigram_offsets, trigram_keys):
+        self.keys = keys
+        self.key_offsets = key_offsets
+        self.key_people = key_people
+        self.trigrams = trigrams
+        self.trigram_offsets = trigram_offsets
+        self.trigram_keys = trigram_keys
+        self.trigram_index = {t: i for i, t in enumerate(trigrams)}
+
+    @classmethod
+    def build(cls, person_names):
+        """
+        Builds the index from a list of names, one per person index.
+        """
+        people_by_key = {}
+        for person, name in enumerate(person_names):
+            people_by_key.setdefault(name.lower(), []).append(person)
+        keys = sorted(people_by_key)
+
+        key_offsets = array("i", [0])
+        key_people = array("i")
+        postings = {}
+        for i, key in enumerate(keys):
+            key_people.extend(people_by_key[key])
+            key_offsets.append(len(key_people))
+            for trigram in trigrams_of(key):
+                postings.setdefault(trigram, array("i")).append(i)
+
+        trigrams = sorted(postings)
+        trigram_offsets = array("i", [0])
+        trigram_keys = array("i")
+        for trigram in trigrams:
+            trigram_keys.extend(postings[trigram])
+            trigram_offsets.append(len(trigram_keys))
+
+        return cls(keys, key_offsets, key_people,
+                   trigrams, trigram_offsets, trigram_keys)
+
+    def people_of(self, key):
+        return self.key_people[self.key_offsets[key]:self.key_offsets[key + 1]]
+
+    def postings(self, trigram):
+        i = self.trigram_index.get(trigram)
+        if i is None:
+            return array("i")
+        return self.trigram_keys[self.trigram_offsets[i]:self.trigram_offsets[i + 1]]
+
+    def prefix(self, query, limit=10):
+        """
+        Returns up to `limit` key numbers of names starting with `query`.
+        """
+        query = query.lower()
+        start = bisect_left(self.keys, query)
+        found = []
+        for i in range(start, min(start + limit, len(self.keys))):
+            if not self.keys[i].startswith(query):
+                break
+            found.append(i)
+        return found
+
+    def candidates(self, query, limit=10):
+        """
+        Returns up to `limit` person indexes whose names best match
+        `query`: exact matches, then prefix matches, then names ranked
+        by trigram similarity.
+        """
+        query = query.strip().lower()
+        scores = {}
+        for rank, key in enumerate(self.prefix(query, limit)):
+            scores[key] = 2 - rank / limit
+
+        # Candidates share one of the query's rarest trigrams; only the
+        # ones sharing the most of them are scored exactly
+        query_trigrams = trigrams_of(query)
+        lists = sorted((p for p in map(self.postings, query_trigrams) if p), key=len)
+        seeds = [p for p in lists[:SEED_TRIGRAMS] if len(p) <= MAX_POSTINGS] or lists[:1]
+        counts = Counter()
+        for postings in seeds:
+            counts.update(postings)
+
+        for key, _ in counts.most_common(RESCORE):
+            # Jaccard similarity of the two trigram sets
+            key_trigrams = trigrams_of(self.keys[key])
+            shared = len(query_trigrams & key_trigrams)
+            score = shared / (len(query_trigrams) + len(key_trigrams) - shared)
+            if score >= MIN_SIMILARITY and score > scores.get(key, 0):
+                scores[key] = score
+
+        ranked = sorted(scores, key=lambda key: (-scores[key], self.keys[key]))
+        people = []
+        for key in ranked:
+            people.extend(self.people_of(key))
+            if len(people) >= limit:
+                break
+        return people[:limit]
+
+
+def trigrams_of(text):
+    """
+    Returns the set of trigrams of `text`, padded so that the start and
+    end of the name count as well.
+    """
+    text = f"  {text} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
@@ -0,0 +1,94 @@
+"""
+Read-only views of the people, movies and names of degrees, backed by
+the Graph and the columns it was loaded from.
+
+They answer the same lookups as the dicts `load_data` used to fill,
+building each record only when it is asked for, so that a dataset
+loaded from a snapshot does not first rebuild a dict of sets for every
+person and movie.
+"""
+
+from bisect import bisect_left
+from collections.abc import Mapping
+
+
+class People(Mapping):
+    """
+    Maps person_ids to a dictionary of: name, birth, movies (a set of
+    movie_ids).
+    """
+
+    def __init__(self, graph, names, births):
+        self.graph = graph
+        self.names = names
+        self.births = births
+
+    def __getitem__(self, person_id):
+        i = self.graph.person_index[person_id]
+        return {
+            "name": self.names[i],
+            "birth": self.births[i],
+            "movies": set(map(self.graph.movie_ids.__getitem__, self.graph.movies_of(i))),
+        }
+
+    def __contains__(self, person_id):
+        return person_id in self.graph.person_index
+
+    def __iter__(self):
+        return iter(self.graph.person_index)
+
+    def __len__(self):
+        return len(self.graph.person_index)
+
+
+class Movies(Mapping):
+    """
+    Maps movie_ids to a dictionary of: title, year, stars (a set of
+    person_ids).
+    """
+
+    def __init__(self, graph, titles, years):
+        self.graph = graph
+        self.titles = titles
+        self.years = years
+
+    def __getitem__(self, movie_id):
+        i = self.graph.movie_index[movie_id]
+        return {
+            "title": self.titles[i],
+            "year": self.years[i],
+            "stars": set(map(self.graph.person_ids.__getitem__, self.graph.stars_of(i))),
+        }
+
+    def __contains__(self, movie_id):
+        return movie_id in self.graph.movie_index
+
+    def __iter__(self):
+        return iter(self.graph.movie_index)
+
+    def __len__(self):
+        return len(self.graph.movie_index)
+
+
+class Names(Mapping):
+    """
+    Maps lowercased names to a set of corresponding person_ids, looked
+    up in the sorted keys of a NameIndex.
+    """
+
+    def __init__(self, graph, name_index):
+        self.graph = graph
+        self.name_index = name_index
+
+    def __getitem__(self, name):
+        keys = self.name_index.keys
+        i = bisect_left(keys, name)
+        if i == len(keys) or keys[i] != name:
+            raise KeyError(name)
+        return set(map(self.graph.person_ids.__getitem__, self.name_index.people_of(i)))
+
+    def __iter__(self):
+        return iter(self.name_index.keys)
+
+    def __len__(self):
+        return len(self.name_index.keys)
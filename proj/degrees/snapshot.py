@@ -0,0 +1,155 @@
+"""
+Binary snapshot of a parsed degrees dataset.
+
+Layout: a fixed header, the (mtime_ns, size) of every source CSV,
+then length-prefixed sections. String columns are stored as the
+number of strings followed by their UTF-8 text, joined by NUL
+characters so that loading splits them in one call; integer columns are raw `array("i")`
+bytes in native byte order, which the header records.
+"""
+
+import os
+import struct
+import sys
+from array import array
+
+MAGIC = b"DEGREES\0"
+VERSION = 3
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+FILENAME = ".degrees-snapshot"
+
+STRING_COLUMNS = ("person_ids", "names", "births", "movie_ids", "titles", "years",
+                  "name_keys", "trigrams")
+ARRAY_COLUMNS = ("person_offsets", "person_movies", "movie_offsets", "movie_people",
+                 "key_offsets", "key_people",
+                 "trigram_offsets", "trigram_keys")
+
+HEADER = struct.Struct("<8sIcB")
+SOURCE = struct.Struct("<qq")
+LENGTH = struct.Struct("<Q")
+
+
+def path_for(directory):
+    return os.path.join(directory, FILENAME)
+
+
+def signature(directory):
+    """
+    Returns the (mtime_ns, size) of each source CSV in `directory`.
+    """
+    stats = (os.stat(os.path.join(directory, name)) for name in SOURCES)
+    return tuple((st.st_mtime_ns, st.st_size) for st in stats)
+
+
+def save(directory, sources, columns):
+    """
+    Writes `columns` (a dict holding every name in STRING_COLUMNS and
+    ARRAY_COLUMNS) as the snapshot for `directory`, stamped with the
+    `signature` its CSVs had when they were parsed.
+    Returns False if the snapshot could not be written, or if a string
+    holds a NUL character.
+    """
+    path = path_for(directory)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, sys.byteorder[0].encode(),
+                                array("i").itemsize))
+            for source in sources:
+                f.write(SOURCE.pack(*source))
+            for name in STRING_COLUMNS:
+                count, text = encode_strings(columns[name])
+                write_section(f, LENGTH.pack(count))
+                write_section(f, text)
+            for name in ARRAY_COLUMNS:
+                write_section(f, columns[name].tobytes())
+        os.replace(tmp, path)
+    except (OSError, ValueError):
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return False
+    return True
+
+
+def load(directory):
+    """
+    Returns the columns stored in the snapshot for `directory`, or None
+    if there is no snapshot or it is stale, corrupt or from another
+    format version or platform.
+    """
+    try:
+        with open(path_for(directory), "rb") as f:
+            data = f.read()
+        current = signature(directory)
+    except OSError:
+        return None
+
+    try:
+        magic, version, byteorder, itemsize = HEADER.unpack_from(data, 0)
+        if (magic != MAGIC or version != VERSION or
+                byteorder != sys.byteorder[0].encode() or
+                itemsize != array("i").itemsize):
+            return None
+        pos = HEADER.size
+        stored = []
+        for _ in SOURCES:
+            stored.append(SOURCE.unpack_from(data, pos))
+            pos += SOURCE.size
+        if tuple(stored) != current:
+            return None
+
+        view = memoryview(data)
+        columns = {}
+        for name in STRING_COLUMNS:
+            count, pos = read_section(view, pos)
+            text, pos = read_section(view, pos)
+            columns[name] = decode_strings(LENGTH.unpack(count)[0], text)
+        for name in ARRAY_COLUMNS:
+            raw, pos = read_section(view, pos)
+            columns[name] = to_array(raw)
+        if pos != len(data):
+            return None
+    except (struct.error, ValueError):
+        return None
+    return columns
+
+
+def write_section(f, raw):
+    f.write(LENGTH.pack(len(raw)))
+    f.write(raw)
+
+
+def read_section(view, pos):
+    (length,) = LENGTH.unpack_from(view, pos)
+    pos += LENGTH.size
+    if pos + length > len(view):
+        raise ValueError("truncated snapshot")
+    return view[pos:pos + length], pos + length
+
+
+def to_array(raw):
+    values = array("i")
+    values.frombytes(raw)
+    return values
+
+
+def encode_strings(strings):
+    """
+    Returns (number of strings, UTF-8 text of the strings joined by NUL),
+    raising ValueError if a string holds a NUL itself.
+    """
+    text = "\0".join(strings)
+    if text.count("\0") != max(len(strings) - 1, 0):
+        raise ValueError("string column holds a NUL character")
+    return len(strings), text.encode("utf-8")
+
+
+def decode_strings(count, text):
+    if not count:
+        return []
+    strings = str(text, "utf-8").split("\0")
+    if len(strings) != count:
+        raise ValueError("corrupt string column")
+    return strings
@@ -0,0 +1,218 @@
+"""
+Single-source BFS trees over a Graph, and an LRU cache of them.
+"""
+
+import struct
+import sys
+from array import array
+from collections import OrderedDict
+
+UNREACHED = 255
+
+MAGIC = b"DEGTREE\0"
+VERSION = 1
+HEADER = struct.Struct("<8sIcBii")
+
+
+class SearchTree():
+    """
+    Distance and (movie, person) parent of every person, as seen from
+    one source. Distances are uint8 with UNREACHED for other components.
+    """
+
+    def __init__(self, source, distance, parent_person, parent_movie):
+        self.source = source
+        self.distance = distance
+        self.parent_person = parent_person
+        self.parent_movie = parent_movie
+
+    @classmethod
+    def build(cls, graph, source):
+        """
+        Runs one full BFS over `graph` from person `source`.
+        """
+        n = len(graph.person_ids)
+        distance = bytearray([UNREACHED]) * n
+        parent_person = array("i", [-1]) * n
+        parent_movie = array("i", [-1]) * n
+        seen_movies = bytearray(len(graph.movie_ids))
+        movies_of, stars_of = graph.movies_of, graph.stars_of
+
+        distance[source] = 0
+        layer = [source]
+        depth = 0
+        while layer:
+            depth += 1
+            if depth >= UNREACHED:
+                raise ValueError("graph too deep for uint8 distances")
+            next_layer = []
+            for person in layer:
+                for movie in movies_of(person):
+                    if seen_movies[movie]:
+                        continue
+                    seen_movies[movie] = 1
+                    for star in stars_of(movie):
+                        if distance[star] == UNREACHED:
+                            distance[star] = depth
+                            parent_person[star] = person
+                            parent_movie[star] = movie
+                            next_layer.append(star)
+            layer = next_layer
+        return cls(source, distance, parent_person, parent_movie)
+
+    def nbytes(self):
+        return (len(self.distance) +
+                self.parent_person.itemsize * len(self.parent_person) +
+                self.parent_movie.itemsize * len(self.parent_movie))
+
+    @staticmethod
+    def nbytes_for(graph):
+        """
+        Returns the nbytes() of any tree built over `graph`.
+        """
+        return len(graph.person_ids) * (1 + 2 * array("i").itemsize)
+
+    def path_to(self, person):
+        """
+        Returns the (movie, person) index path from the source to
+        `person`, or None if they are not connected.
+        """
+        if self.distance[person] == UNREACHED:
+            return None
+        path = []
+        while person != self.source:
+            path.append((self.parent_movie[person], person))
+            person = self.parent_person[person]
+        path.reverse()
+        return path
+
+    def path_from(self, person):
+        """
+        Returns the (movie, person) index path from `person` back to
+        the source, or None if they are not connected.
+        """
+        if self.distance[person] == UNREACHED:
+            return None
+        path = []
+        while person != self.source:
+            movie = self.parent_movie[person]
+            person = self.parent_person[person]
+            path.append((movie, person))
+        return path
+
+    def save(self, filename):
+        with open(filename, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, sys.byteorder[0].encode(),
+                                self.parent_person.itemsize,
+                                self.source, len(self.distance)))
+            f.write(self.distance)
+            f.write(self.parent_person.tobytes())
+            f.write(self.parent_movie.tobytes())
+
+    @classmethod
+    def load(cls, filename, graph):
+        """
+        Reads a tree written by `save` for the same `graph`.
+        """
+        with open(filename, "rb") as f:
+            data = f.read()
+        magic, version, byteorder, itemsize, source, n = HEADER.unpack_from(data, 0)
+        if (magic != MAGIC or version != VERSION or
+                byteorder != sys.byteorder[0].encode() or
+                itemsize != array("i").itemsize):
+            raise ValueError(f"{filename} is not a compatible search tree")
+        if n != len(graph.person_ids):
+            raise ValueError(f"{filename} was built for a different dataset")
+        if len(data) != HEADER.size + n * (1 + 2 * itemsize):
+            raise ValueError(f"{filename} is truncated")
+
+        pos = HEADER.size
+        distance = bytearray(data[pos:pos + n])
+        pos += n
+        parent_person = array("i")
+        parent_person.frombytes(data[pos:pos + n * itemsize])
+        pos += n * itemsize
+        parent_movie = array("i")
+        parent_movie.frombytes(data[pos:])
+        return cls(source, distance, parent_person, parent_movie)
+
+
+class TreeCache():
+    """
+    LRU cache of SearchTrees keyed by source, bounded by `max_bytes`.
+
+    A source gets a tree once it has been queried `hot` times; until
+    then queries from it fall back to an ordinary search. Sources whose
+    tree was rejected as too big or evicted are not given a tree again
+    while they are remembered, so that a cache too small for its hot
+    sources does not rebuild trees over and over. Query counts and
+    rejected sources are each kept for at most `max_sources` sources.
+    """
+
+    def __init__(self, max_bytes, hot=3, max_sources=4096):
+        self.max_bytes = max_bytes
+        self.hot = hot
+        self.max_sources = max_sources
+        self.trees = OrderedDict()
+        self.counts = OrderedDict()
+        self.rejected = OrderedDict()
+        self.nbytes = 0
+
+    def get(self, source):
+        tree = self.trees.get(source)
+        if tree is not None:
+            self.trees.move_to_end(source)
+        return tree
+
+    def put(self, tree):
+        """
+        Adds `tree`, evicting least recently used trees to stay within
+        `max_bytes`. Returns False if the tree alone is too big.
+        """
+        size = tree.nbytes()
+        if size > self.max_bytes:
+            self.reject(tree.source)
+            return False
+        old = self.trees.pop(tree.source, None)
+        if old is not None:
+            self.nbytes -= old.nbytes()
+        while self.trees and self.nbytes + size > self.max_bytes:
+            source, evicted = self.trees.popitem(last=False)
+            self.nbytes -= evicted.nbytes()
+            self.reject(source)
+        self.trees[tree.source] = tree
+        self.nbytes += size
+        self.counts.pop(tree.source, None)
+        self.rejected.pop(tree.source, None)
+        return True
+
+    def clear(self):
+        self.trees.clear()
+        self.counts.clear()
+        self.rejected.clear()
+        self.nbytes = 0
+
+    def touch(self, source, size=0):
+        """
+        Records a query from `source`; returns True once it is hot and
+        a tree of `size` bytes could be kept for it.
+        """
+        if source in self.rejected:
+            self.rejected.move_to_end(source)
+            return False
+        count = self.counts.pop(source, 0) + 1
+        self.counts[source] = count
+        if len(self.counts) > self.max_sources:
+            self.counts.popitem(last=False)
+        if count < self.hot:
+            return False
+        if size > self.max_bytes:
+            self.reject(source)
+            return False
+        return True
+
+    def reject(self, source):
+        self.rejected[source] = True
+        self.rejected.move_to_end(source)
+        if len(self.rejected) > self.max_sources:
+            self.rejected.popitem(last=False)
@@ -0,0 +1,112 @@
+"""
+Benchmark heredity inference on synthetic pedigrees.
+
+Enumeration, over sets of people and over bitmasks as heredity.main
+now does, is run on families small enough to finish and checked against
+variable elimination, which then runs on pedigrees of hundreds of
+people.
+
+Usage: python benchmark.py
+"""
+
+import random
+import time
+
+import heredity
+import inference
+
+# Family sizes to solve by both methods
+ENUMERATED = (3, 4, 5, 6, 7)
+
+# Family sizes to solve by variable elimination only
+ELIMINATED = (25, 50, 100, 200, 400)
+
+
+def pedigree(n, founders=0.3, observed=0.5, seed=0):
+    """
+    Return `n` people in the format of `heredity.load_data`. The first
+    are founders; everyone after is a founder or the child of one of the
+    last 20 people and, where possible, a founder among them who married
+    into the family.
+    """
+    rng = random.Random(seed)
+    people = {}
+    names = []
+    for i in range(n):
+        name = f"P{i}"
+        mother = father = None
+        if i >= 2 and rng.random() > founders:
+            recent = names[-20:]
+            mother = rng.choice(recent)
+            others = [p for p in recent if p != mother]
+            married_in = [p for p in others if people[p]["mother"] is None]
+            father = rng.choice(married_in or others)
+        trait = rng.choice((True, False)) if rng.random() < observed else None
+        people[name] = {"name": name, "mother": mother, "father": father, "trait": trait}
+        names.append(name)
+    return people
+
+
+def enumerate_sets(people):
+    """
+    Return the distributions of the set-based enumeration heredity.main
+    used, over every assignment of genes and traits.
+    """
+    probabilities = {
+        person: {"gene": {2: 0, 1: 0, 0: 0}, "trait": {True: 0, False: 0}}
+        for person in people
+    }
+    names = set(people)
+    for have_trait in heredity.powerset(names):
+        if any(people[person]["trait"] is not None and
+               people[person]["trait"] != (person in have_trait)
+               for person in names):
+            continue
+        for one_gene in heredity.powerset(names):
+            for two_genes in heredity.powerset(names - one_gene):
+                p = heredity.joint_probability(people, one_gene, two_genes, have_trait)
+                heredity.update(probabilities, one_gene, two_genes, have_trait, p)
+    heredity.normalize(probabilities)
+    return probabilities
+
+
+def enumerate_bitmasks(people):
+    """
+    Return the distributions heredity.main computes, by its bitmask
+    enumeration with observed traits fixed.
+    """
+    probabilities = heredity.enumerate_probabilities(people)
+    heredity.normalize(probabilities)
+    return probabilities
+
+
+def difference(a, b):
+    """
+    Return the largest difference between two sets of distributions.
+    """
+    return max(abs(a[person][field][value] - b[person][field][value])
+               for person in a for field in a[person] for value in a[person][field])
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    print(f"{'people':>6}{'sets s':>10}{'bitmasks s':>12}{'eliminate s':>13}{'difference':>12}")
+    for n in ENUMERATED:
+        people = pedigree(n)
+        expected, enumerated = timed(enumerate_sets, people)
+        masked, bitmasks = timed(enumerate_bitmasks, people)
+        found, eliminated = timed(inference.infer, people)
+        error = max(difference(expected, masked), difference(expected, found))
+        print(f"{n:>6}{enumerated:>10.3f}{bitmasks:>12.3f}{eliminated:>13.3f}{error:>12.1e}")
+    for n in ELIMINATED:
+        _, eliminated = timed(inference.infer, pedigree(n))
+        print(f"{n:>6}{'-':>10}{'-':>12}{eliminated:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
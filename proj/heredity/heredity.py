@@ -37,6 +37,29 @@ PROBS = {
 }
 
 
+def inheritance(gene_num, mother, father):
+    """
+    Return the probability that a child of parents with `mother` and
+    `father` copies of the gene has `gene_num` copies.
+    """
+    pass_mother, pass_father = (
+        PROBS["mutation"] if genes == 0 else 0.5 if genes == 1 else 1 - PROBS["mutation"]
+        for genes in (mother, father)
+    )
+    if gene_num == 0:
+        return (1 - pass_mother) * (1 - pass_father)
+    elif gene_num == 1:
+        return pass_mother * (1 - pass_father) + (1 - pass_mother) * pass_father
+    else:
+        return pass_mother * pass_father
+
+
+# Tables for the bitmask functions, indexed by gene count
+GENE = [PROBS["gene"][g] for g in range(3)]
+TRAIT = [[PROBS["trait"][g][False], PROBS["trait"][g][True]] for g in range(3)]
+INHERITANCE = [[[inheritance(g, m, f) for f in range(3)] for m in range(3)] for g in range(3)]
+
+
 def main():
 
     # Check for proper usage
@@ -44,6 +67,28 @@ def main():
         sys.exit("Usage: python heredity.py data.csv")
     people = load_data(sys.argv[1])
 
+    # Sum the joint probability of every assignment consistent with the evidence
+    probabilities = enumerate_probabilities(people)
+
+    # Ensure probabilities sum to 1
+    normalize(probabilities)
+
+    # Print results
+    for person in people:
+        print(f"{person}:")
+        for field in probabilities[person]:
+            print(f"  {field.capitalize()}:")
+            for value in probabilities[person][field]:
+                p = probabilities[person][field][value]
+                print(f"    {value}: {p:.4f}")
+
+
+def enumerate_probabilities(people):
+    """
+    Return the unnormalized gene and trait distributions of every person,
+    summing the joint probability of every assignment consistent with the
+    observed traits. Assignments are enumerated lazily as bitmasks.
+    """
     # Keep track of gene and trait probabilities for each person
     probabilities = {
         person: {
@@ -60,38 +105,32 @@ def main():
         for person in people
     }
 
-    # Loop over all sets of people who might have the trait
-    names = set(people)
-    for have_trait in powerset(names):
+    # Number everyone so that sets of people are bitmasks, bit i for names[i]
+    names, parents = bitmasks(people)
+    everyone = (1 << len(names)) - 1
 
-        # Check if current set of people violates known information
-        fails_evidence = any(
-            (people[person]["trait"] is not None and
-             people[person]["trait"] != (person in have_trait))
-            for person in names
-        )
-        if fails_evidence:
-            continue
+    # Only unobserved traits vary; observed ones are fixed by the evidence
+    observed = sum(1 << i for i, name in enumerate(names) if people[name]["trait"])
+    unobserved = sum(1 << i for i, name in enumerate(names) if people[name]["trait"] is None)
+
+    gene_totals = [[0, 0, 0] for _ in names]
+    trait_totals = [[0, 0] for _ in names]
+    for have_trait in submasks(unobserved):
+        have_trait |= observed
 
         # Loop over all sets of people who might have the gene
-        for one_gene in powerset(names):
-            for two_genes in powerset(names - one_gene):
+        for one_gene in range(everyone + 1):
+            for two_genes in submasks(everyone & ~one_gene):
 
-                # Update probabilities with new joint probability
-                p = joint_probability(people, one_gene, two_genes, have_trait)
-                update(probabilities, one_gene, two_genes, have_trait, p)
+                # Update totals with new joint probability
+                p = joint_probability_bits(parents, one_gene, two_genes, have_trait)
+                update_bits(gene_totals, trait_totals, one_gene, two_genes, have_trait, p)
 
-    # Ensure probabilities sum to 1
-    normalize(probabilities)
+    for i, person in enumerate(names):
+        probabilities[person]["gene"].update(enumerate(gene_totals[i]))
+        probabilities[person]["trait"].update({True: trait_totals[i][1], False: trait_totals[i][0]})
 
-    # Print results
-    for person in people:
-        print(f"{person}:")
-        for field in probabilities[person]:
-            print(f"  {field.capitalize()}:")
-            for value in probabilities[person][field]:
-                p = probabilities[person][field][value]
-                print(f"    {value}: {p:.4f}")
+    return probabilities
 
 
 def load_data(filename):
@@ -128,6 +167,34 @@ def powerset(s):
     ]
 
 
+def bitmasks(people):
+    """
+    Return (names, parents) for the bitmask functions: person i is
+    names[i] and bit 1 << i, and parents[i] is the (mother, father) pair
+    of their indices, or None if their parents are unknown.
+    """
+    names = list(people)
+    index = {name: i for i, name in enumerate(names)}
+    parents = [
+        (index[people[name]["mother"]], index[people[name]["father"]])
+        if people[name]["mother"] is not None else None
+        for name in names
+    ]
+    return names, parents
+
+
+def submasks(mask):
+    """
+    Yield every subset of bitmask `mask`, from `mask` itself down to 0.
+    """
+    subset = mask
+    while True:
+        yield subset
+        if not subset:
+            return
+        subset = (subset - 1) & mask
+
+
 def joint_probability(people, one_gene, two_genes, have_trait):
     """
     Compute and return a joint probability.
@@ -218,6 +285,35 @@ def update(probabilities, one_gene, two_genes, have_trait, p):
             update_trait(people)
 
 
+def joint_probability_bits(parents, one_gene, two_genes, have_trait):
+    """
+    Return the same joint probability as `joint_probability`, with
+    `one_gene`, `two_genes` and `have_trait` as bitmasks over the people
+    numbered by `bitmasks`.
+    """
+    genes = [(one_gene >> i & 1) | (two_genes >> i & 1) << 1 for i in range(len(parents))]
+    joint_pr = 1
+    for i, gene_num in enumerate(genes):
+        if parents[i] is None:
+            joint_pr *= GENE[gene_num]
+        else:
+            mother, father = parents[i]
+            joint_pr *= INHERITANCE[gene_num][genes[mother]][genes[father]]
+        joint_pr *= TRAIT[gene_num][have_trait >> i & 1]
+    return joint_pr
+
+
+def update_bits(gene_totals, trait_totals, one_gene, two_genes, have_trait, p):
+    """
+    Add joint probability `p` to the totals of every person: gene_totals[i]
+    is indexed by person i's gene count and trait_totals[i] by whether
+    they have the trait, as given by the bitmasks.
+    """
+    for i in range(len(gene_totals)):
+        gene_totals[i][(one_gene >> i & 1) | (two_genes >> i & 1) << 1] += p
+        trait_totals[i][have_trait >> i & 1] += p
+
+
 def normalize(probabilities):
     """
     Update `probabilities` such that each probability distribution
@@ -0,0 +1,207 @@
+"""
+Exact inference for heredity by variable elimination.
+
+The family is a Bayesian network: every person's gene count depends on
+the gene counts of their parents, and their trait on their own gene
+count. Observed traits are folded into the factor of their person.
+Gene counts are summed out one at a time, in an order that keeps the
+intermediate factors small, and the clique tree this leaves gives every
+person's posterior in one more pass. The cost grows with the width of
+the pedigree rather than exponentially with its size.
+
+Usage: python inference.py data.csv
+"""
+
+import itertools
+import sys
+
+from heredity import INHERITANCE, PROBS, load_data
+
+GENES = (0, 1, 2)
+
+
+class Factor():
+    """
+    A nonnegative function of the gene counts of `variables`, with
+    `table` mapping each tuple of gene counts to its value.
+    """
+
+    def __init__(self, variables, table):
+        self.variables = variables
+        self.table = table
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python inference.py data.csv")
+    people = load_data(sys.argv[1])
+    probabilities = infer(people)
+
+    for person in people:
+        print(f"{person}:")
+        for field in probabilities[person]:
+            print(f"  {field.capitalize()}:")
+            for value in probabilities[person][field]:
+                p = probabilities[person][field][value]
+                print(f"    {value}: {p:.4f}")
+
+
+def infer(people):
+    """
+    Return the gene and trait distribution of every person given the
+    observed traits, in the format `heredity.normalize` leaves them.
+    """
+    genes = marginals([person_factor(people[person]) for person in people])
+
+    probabilities = {}
+    for person in people:
+        gene = genes[person]
+        observed = people[person]["trait"]
+        if observed is None:
+            has_trait = sum(gene[g] * PROBS["trait"][g][True] for g in GENES)
+        else:
+            has_trait = 1.0 if observed else 0.0
+        probabilities[person] = {
+            "gene": {2: gene[2], 1: gene[1], 0: gene[0]},
+            "trait": {True: has_trait, False: 1 - has_trait},
+        }
+    return probabilities
+
+
+def person_factor(person):
+    """
+    Return the factor of one person: the probability of their gene count
+    given their parents', times the probability of their observed trait.
+    """
+    name, mother, father = person["name"], person["mother"], person["father"]
+    trait = person["trait"]
+
+    def evidence(genes):
+        return 1.0 if trait is None else PROBS["trait"][genes][trait]
+
+    if mother is None:
+        return Factor((name,), {(g,): PROBS["gene"][g] * evidence(g) for g in GENES})
+
+    table = {
+        (g, m, f): INHERITANCE[g][m][f] * evidence(g)
+        for g, m, f in itertools.product(GENES, repeat=3)
+    }
+    return Factor((name, mother, father), table)
+
+
+def marginals(factors):
+    """
+    Return the normalised distribution of every variable's gene count
+    given the product of `factors`.
+
+    Eliminating the variables one by one builds a clique tree: each step
+    multiplies the factors mentioning its variable into a clique and
+    sends the product, with the variable summed out, to the later step
+    that uses it. Passing messages back down the tree then gives every
+    clique the product of all factors, summed over the variables outside
+    it, so that all marginals cost two passes instead of one elimination
+    per person.
+    """
+    order = elimination_order(factors)
+    step_of = {variable: step for step, variable in enumerate(order)}
+
+    # Each original factor belongs to the clique of its first variable
+    # to be eliminated
+    local = [[] for _ in order]
+    for factor in factors:
+        local[min(step_of[v] for v in factor.variables)].append(factor)
+
+    # Upward pass: messages[i] leaves clique i for the first later
+    # clique whose variable it mentions
+    messages = [None] * len(order)
+    children = [[] for _ in order]
+    pending = []
+    for step, variable in enumerate(order):
+        incoming = [i for i in pending if variable in messages[i].variables]
+        pending = [i for i in pending if variable not in messages[i].variables]
+        children[step] = incoming
+        product = multiply(local[step] + [messages[i] for i in incoming])
+        messages[step] = marginalize(product, [v for v in product.variables if v != variable])
+        pending.append(step)
+
+    # Downward pass, from the last cliques to the first
+    downward = [None] * len(order)
+    result = {}
+    for step in reversed(range(len(order))):
+        above = [downward[step]] if downward[step] is not None else []
+        below = [messages[i] for i in children[step]]
+        belief = multiply(local[step] + above + below)
+        clique = belief.variables
+        distribution = marginalize(belief, [order[step]]).table
+        total = sum(distribution.values())
+        result[order[step]] = {g: distribution[(g,)] / total for g in GENES}
+
+        for child in children[step]:
+            others = [messages[i] for i in children[step] if i != child]
+            product = multiply(local[step] + above + others, clique)
+            downward[child] = marginalize(product, list(messages[child].variables))
+    return result
+
+
+def elimination_order(factors):
+    """
+    Return every variable, greedily ordered to eliminate first the one
+    with the fewest neighbours left.
+    """
+    neighbours = {}
+    for factor in factors:
+        for variable in factor.variables:
+            neighbours.setdefault(variable, set()).update(factor.variables)
+    for variable in neighbours:
+        neighbours[variable].discard(variable)
+
+    order = []
+    while neighbours:
+        variable = min(neighbours, key=lambda v: (len(neighbours[v]), v))
+        order.append(variable)
+        # Its neighbours become connected to each other
+        linked = neighbours.pop(variable)
+        for other in linked:
+            neighbours[other].discard(variable)
+            neighbours[other].update(linked - {other})
+    return order
+
+
+def multiply(factors, variables=()):
+    """
+    Return the product of `factors`, over `variables` and all of theirs.
+    """
+    variables = list(variables)
+    for factor in factors:
+        for v in factor.variables:
+            if v not in variables:
+                variables.append(v)
+    positions = [[variables.index(v) for v in factor.variables] for factor in factors]
+
+    table = {}
+    for assignment in itertools.product(GENES, repeat=len(variables)):
+        p = 1.0
+        for factor, where in zip(factors, positions):
+            p *= factor.table[tuple(assignment[i] for i in where)]
+        table[assignment] = p
+    return Factor(tuple(variables), table)
+
+
+def marginalize(factor, keep):
+    """
+    Return `factor` summed over every variable not in `keep`, scaled so
+    that its largest value is 1 to avoid underflow.
+    """
+    where = [factor.variables.index(v) for v in keep]
+    table = dict.fromkeys(itertools.product(GENES, repeat=len(keep)), 0.0)
+    for assignment, p in factor.table.items():
+        table[tuple(assignment[i] for i in where)] += p
+
+    largest = max(table.values())
+    if largest > 0:
+        table = {key: value / largest for key, value in table.items()}
+    return Factor(tuple(keep), table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark PageRank on a synthetic corpus.
+
+Usage: python benchmark.py [pages] [samples]
+"""
+
+import random
+import sys
+import time
+
+import incremental
+import pagerank
+import personalized
+import solvers
+from matrix import SURFERS, LinkMatrix
+
+# Samples drawn by the per-sample sampler, which is O(pages) per sample
+LEGACY_SAMPLES = 200
+
+# Seeds averaged over for the accuracy of sampling at pagerank.SAMPLES
+ACCURACY_SEEDS = 5
+
+# Links added and removed before updating ranks incrementally
+CHANGED_LINKS = 10
+
+# Seed sets, and pages per seed set, for personalized PageRank
+SEED_SETS = 20
+SEEDS = 3
+
+
+def synthetic_corpus(n, links=8, dangling=0.05, seed=0):
+    """
+    Return a corpus of `n` pages in the format of `crawl`. Link targets
+    are skewed towards low page numbers, like popular pages on the web.
+    """
+    rng = random.Random(seed)
+    pages = [f"{i}.html" for i in range(n)]
+    corpus = {}
+    for i, page in enumerate(pages):
+        count = 0 if rng.random() < dangling else rng.randint(1, 2 * links)
+        corpus[page] = {pages[int(n * rng.random() ** 2)] for _ in range(count)} - {page}
+    return corpus
+
+
+def legacy_sample(corpus, damping_factor, n):
+    """
+    Return visit frequencies of one surfer drawing each step from the
+    full `transition_model` distribution.
+    """
+    counts = dict.fromkeys(corpus, 0)
+    page = random.choice(list(corpus))
+    counts[page] += 1
+    for _ in range(n - 1):
+        model = pagerank.transition_model(corpus, page, damping_factor)
+        page = random.choices(list(model), list(model.values()))[0]
+        counts[page] += 1
+    return {page: count / n for page, count in counts.items()}
+
+
+def random_changes(corpus, count, seed=0):
+    """
+    Return changes adding and removing `count` links each.
+    """
+    rng = random.Random(seed)
+    pages = sorted(corpus)
+    linking = [page for page in pages if corpus[page]]
+    return {
+        "add_links": [(rng.choice(pages), rng.choice(pages)) for _ in range(count)],
+        "remove_links": [(page, min(corpus[page])) for page in rng.sample(linking, count)],
+    }
+
+
+def l1(a, b):
+    return sum(abs(x - y) for x, y in zip(a, b))
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python benchmark.py [pages] [samples]")
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    samples = int(sys.argv[2]) if len(sys.argv) > 2 else 10000000
+
+    corpus = synthetic_corpus(n)
+    edges = sum(map(len, corpus.values()))
+    print(f"{n} pages, {edges} links")
+
+    matrix, elapsed = timed(LinkMatrix.from_corpus, corpus)
+    print(f"  build matrix      {elapsed:9.3f}s")
+    ranks, elapsed = timed(matrix.pagerank, pagerank.DAMPING)
+    print(f"  iterate           {elapsed:9.3f}s")
+    exact = matrix.pagerank(pagerank.DAMPING, 1e-12)
+    for solver in solvers.SOLVERS:
+        ranks, diagnostics = solvers.solve(matrix, pagerank.DAMPING, solver)
+        print(f"  {solver:<16}{diagnostics['seconds']:9.3f}s"
+              f"  {diagnostics['iterations']:3} iterations, L1 error {l1(ranks, exact):.1e}")
+
+    _, elapsed = timed(legacy_sample, corpus, pagerank.DAMPING, LEGACY_SAMPLES)
+    print(f"  legacy sampling   {LEGACY_SAMPLES / elapsed:12.0f} samples/s")
+    sampled, elapsed = timed(matrix.sample, pagerank.DAMPING, samples, 0)
+    print(f"  batched sampling  {samples / elapsed:12.0f} samples/s"
+          f"  ({samples} samples in {elapsed:.2f}s, L1 error {l1(sampled, exact):.4f})")
+    for label, surfers in (("batched", SURFERS), ("single chain", 1)):
+        errors = [l1(matrix.sample(pagerank.DAMPING, pagerank.SAMPLES, seed, surfers), exact)
+                  for seed in range(ACCURACY_SEEDS)]
+        print(f"  {label:<14}n = {pagerank.SAMPLES}"
+              f"  mean L1 error {sum(errors) / ACCURACY_SEEDS:.4f} over {ACCURACY_SEEDS} seeds")
+
+    changed = LinkMatrix.from_corpus(
+        incremental.apply_changes(corpus, random_changes(corpus, CHANGED_LINKS)))
+    exact = changed.pagerank(pagerank.DAMPING, 1e-12)
+    print(f"after changing {2 * CHANGED_LINKS} links:")
+    for tolerance in (0.001, 1e-6, 1e-8):
+        ranks, elapsed = timed(changed.pagerank, pagerank.DAMPING, tolerance)
+        print(f"  cold start, max change {tolerance:<7g}"
+              f"{elapsed:9.3f}s  L1 error {l1(ranks, exact):.1e}")
+    previous = matrix.to_dict(matrix.pagerank(pagerank.DAMPING, 1e-12))
+    for tolerance in (1e-4, 1e-6):
+        ranks, elapsed = timed(incremental.update, changed, previous, pagerank.DAMPING, tolerance)
+        print(f"  incremental, residual {tolerance:<7g}"
+              f"{elapsed:9.3f}s  L1 error {l1(ranks, exact):.1e}")
+
+    rng = random.Random(0)
+    teleports = [rng.sample(matrix.pages, SEEDS) for _ in range(SEED_SETS)]
+    stats = {}
+    _, elapsed = timed(personalized.personalized_pagerank, matrix, teleports, pagerank.DAMPING,
+                       personalized.TOLERANCE, stats)
+    iterations = stats["iterations"]
+    print(f"personalized, {SEED_SETS} seed sets of {SEEDS} pages:")
+    print(f"  {elapsed:.3f}s, {elapsed / SEED_SETS * 1e3:.1f}ms per seed set, "
+          f"{min(iterations)}-{max(iterations)} iterations")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Incremental crawler for a directory of HTML pages.
+
+Pages are listed with os.scandir and parsed by a thread pool. The links
+found in each page are kept in an index file inside the directory,
+keyed by the page's modification time and size, so a later crawl only
+parses the pages that changed since.
+"""
+
+import gc
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+LINK = re.compile(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"")
+
+INDEX = ".pagerank-index"
+VERSION = 1
+WORKERS = 8
+
+# Pages parsed per task handed to the thread pool
+BATCH = 256
+
+
+def crawl(directory, workers=WORKERS, index=True):
+    """
+    Return the same dictionary as `pagerank.crawl`: each page mapped to
+    the set of other pages in the corpus that it links to. With `index`,
+    pages unchanged since the last crawl are not parsed again.
+    """
+    # Crawling allocates a container per page and per link list;
+    # collecting cycles among them is wasted work
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        links, files = read_links(directory, workers, index)
+        pages = files.keys()
+        corpus = {}
+        for name in files:
+            corpus[name] = pages & links[name]
+            corpus[name].discard(name)
+        return corpus
+    finally:
+        if collecting:
+            gc.enable()
+
+
+def read_links(directory, workers, index):
+    """
+    Return ({page: links}, {page: (mtime_ns, size)}) for the pages in
+    `directory`, parsing only those the index does not know as they are.
+    """
+    files = scan(directory)
+    known = load_index(directory) if index else {}
+
+    links = {}
+    changed = []
+    for name, signature in files.items():
+        entry = known.get(name)
+        if entry is not None and entry[0] == signature:
+            links[name] = entry[1]
+        else:
+            changed.append(name)
+
+    if changed:
+        batches = [[os.path.join(directory, name) for name in changed[i:i + BATCH]]
+                   for i in range(0, len(changed), BATCH)]
+        with ThreadPoolExecutor(workers) as executor:
+            for batch in executor.map(parse_batch, batches):
+                links.update(zip(changed, batch))
+                del changed[:len(batch)]
+        save = True
+    else:
+        save = known.keys() != files.keys()
+    if index and save:
+        save_index(directory, {name: (files[name], links[name]) for name in files})
+    return links, files
+
+
+def scan(directory):
+    """
+    Return the (mtime_ns, size) of every .html file in `directory`.
+    """
+    files = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.endswith(".html") and entry.is_file():
+                st = entry.stat()
+                files[entry.name] = (st.st_mtime_ns, st.st_size)
+    return files
+
+
+def parse(path):
+    """
+    Return the sorted list of distinct link targets in an HTML file.
+    """
+    with open(path) as f:
+        return sorted(set(LINK.findall(f.read())))
+
+
+def parse_batch(paths):
+    return [parse(path) for path in paths]
+
+
+def load_index(directory):
+    """
+    Return the index as {page: ((mtime_ns, size), links)}, or an empty
+    dict if there is none or it cannot be read.
+    """
+    try:
+        with open(os.path.join(directory, INDEX), encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != VERSION:
+            return {}
+        return {name: ((mtime, size), links)
+                for name, (mtime, size, links) in data["pages"].items()}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return {}
+
+
+def save_index(directory, index):
+    """
+    Write the index as one JSON document, replacing the old file only
+    once the new one is complete. Return False if it could not be written.
+    """
+    path = os.path.join(directory, INDEX)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": VERSION,
+                "pages": {name: [mtime, size, links]
+                          for name, ((mtime, size), links) in sorted(index.items())},
+            }, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return False
+    return True
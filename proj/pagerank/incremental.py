@@ -0,0 +1,120 @@
+"""
+Incremental PageRank after small changes to the link graph.
+
+PageRank with dangling pages spread uniformly is the normalised
+solution y of the linear system y = (1 - d) + d * P y, where P only
+holds real links. The teleport term does not depend on the number of
+pages, so adding or removing pages does not disturb every page.
+Starting from the previous ranks, the residual r = (1 - d) + d * P y - y
+is nonzero only around the changes, and it is pushed to neighbours page
+by page until every entry is below the tolerance. Pages far from any
+change are never touched.
+"""
+
+from collections import deque
+
+from matrix import LinkMatrix
+
+# Largest residual left on any page, relative to its rank of 1 / N
+TOLERANCE = 1e-6
+
+
+def apply_changes(corpus, changes):
+    """
+    Return a new corpus with `changes` applied, sharing the link sets of
+    pages that did not change. `changes` is a dict with any of the keys
+    "add_pages", "remove_pages" (lists of pages) and "add_links",
+    "remove_links" (lists of (page, linked page) pairs). Links to
+    removed pages are dropped, and links to pages not in the corpus are
+    not added, so that every link is to another page in the corpus.
+    """
+    corpus = dict(corpus)
+    copied = set()
+
+    def links_of(page):
+        if page not in copied:
+            corpus[page] = set(corpus.get(page, ()))
+            copied.add(page)
+        return corpus[page]
+
+    for page in changes.get("add_pages", ()):
+        links_of(page)
+    removed = set()
+    for page in changes.get("remove_pages", ()):
+        if corpus.pop(page, None) is not None:
+            removed.add(page)
+    if removed:
+        for page in corpus:
+            if not removed.isdisjoint(corpus[page]):
+                links_of(page).difference_update(removed)
+    for page, link in changes.get("remove_links", ()):
+        if page in corpus:
+            links_of(page).discard(link)
+    for page, link in changes.get("add_links", ()):
+        if page in corpus and link in corpus and page != link:
+            links_of(page).add(link)
+    return corpus
+
+
+def update_pagerank(corpus, ranks, changes, damping_factor, tolerance=TOLERANCE):
+    """
+    Return (new corpus, new ranks) after applying `changes` to `corpus`,
+    warm-starting from the `ranks` dictionary computed before them.
+    """
+    corpus = apply_changes(corpus, changes)
+    matrix = LinkMatrix.from_corpus(corpus)
+    return corpus, matrix.to_dict(update(matrix, ranks, damping_factor, tolerance))
+
+
+def update(matrix, ranks, damping_factor, tolerance=TOLERANCE, stats=None):
+    """
+    Return the list of PageRank values of `matrix`, starting from the
+    `ranks` dictionary of an earlier version of the graph. Pages that
+    are new start from 0. `stats`, if given, counts the pages pushed.
+    """
+    n = len(matrix)
+    d = damping_factor
+
+    # Scale the old ranks to the total the linear system's solution has
+    estimate = [ranks.get(page, 0.0) for page in matrix.pages]
+    dangling = sum(estimate[i] for i in matrix.dangling)
+    scale = n * (1 - d) / (1 - d + d * dangling) if estimate else 1.0
+    estimate = [rank * scale for rank in estimate]
+
+    teleport = 1 - d
+    residual = [teleport + d * incoming - value
+                for incoming, value in zip(matrix.propagate(estimate), estimate)]
+
+    threshold = tolerance
+    offsets, targets = matrix.out_links()
+    degrees = matrix.out_degree
+    queued = bytearray(n)
+    queue = deque()
+    for i, value in enumerate(residual):
+        if abs(value) > threshold:
+            queue.append(i)
+            queued[i] = 1
+
+    pushes = 0
+    while queue:
+        page = queue.popleft()
+        queued[page] = 0
+        value = residual[page]
+        estimate[page] += value
+        residual[page] = 0.0
+        pushes += 1
+        degree = degrees[page]
+        if not degree:
+            continue
+        share = d * value / degree
+        for target in targets[offsets[page]:offsets[page + 1]]:
+            value = residual[target] + share
+            residual[target] = value
+            if (value > threshold or value < -threshold) and not queued[target]:
+                queue.append(target)
+                queued[target] = 1
+
+    if stats is not None:
+        stats["pushes"] = pushes
+    total = sum(estimate)
+    return [value / total for value in estimate]
@@ -0,0 +1,171 @@
+"""
+Sparse link matrix for PageRank.
+
+The corpus is turned once into a compressed sparse row (CSR) matrix of
+incoming links: pages are numbered in sorted order, and the pages
+linking to page i are sources[offsets[i]:offsets[i + 1]]. Pages without
+links are treated as linking to every page, including themselves.
+"""
+
+import math
+import random
+from array import array
+from collections import Counter
+from itertools import accumulate
+from operator import mul, sub
+
+# Random surfers walking at once when sampling
+SURFERS = 1000
+
+# Fewest pages each surfer visits, so that its walk follows the links
+# rather than reflecting where it started
+MIN_WALK = 100
+
+# Bias towards the random start left after a surfer's burn-in steps
+BURN_IN_ERROR = 1e-3
+
+
+class LinkMatrix():
+
+    def __init__(self, pages, offsets, sources, out_degree, outgoing=None):
+        self.pages = pages
+        self.offsets = offsets
+        self.sources = sources
+        self.out_degree = out_degree
+        self.index = {page: i for i, page in enumerate(pages)}
+        self.dangling = array("i", [i for i, degree in enumerate(out_degree) if not degree])
+        self.outgoing = outgoing
+        self.inverse_degree = array("d", [1 / degree if degree else 0.0 for degree in out_degree])
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        """
+        Build the matrix from `crawl` output: a dict mapping each page
+        to the set of pages it links to.
+        """
+        pages = sorted(corpus)
+        index = {page: i for i, page in enumerate(pages)}
+        incoming = [[] for _ in pages]
+        out_degree = array("i")
+        out_offsets = array("i", [0])
+        targets = array("i")
+        for i, page in enumerate(pages):
+            links = sorted(index[link] for link in corpus[page] if link in index)
+            out_degree.append(len(links))
+            targets.extend(links)
+            out_offsets.append(len(targets))
+            for link in links:
+                incoming[link].append(i)
+
+        offsets = array("i", [0])
+        sources = array("i")
+        for links in incoming:
+            sources.extend(links)
+            offsets.append(len(sources))
+        return cls(pages, offsets, sources, out_degree, (out_offsets, targets))
+
+    def __len__(self):
+        return len(self.pages)
+
+    def step(self, ranks, damping_factor):
+        """
+        Return the ranks after one step of the random surfer: one
+        multiplication by the column-stochastic Google matrix.
+        """
+        n = len(self.pages)
+        dangling = sum(ranks[i] for i in self.dangling)
+        base = (1 - damping_factor) / n + damping_factor * dangling / n
+        return [base + damping_factor * total for total in self.propagate(ranks)]
+
+    def propagate(self, ranks):
+        """
+        Return, for every page, the sum over pages linking to it of
+        their rank divided by their number of links.
+        """
+        shares = list(map(mul, ranks, self.inverse_degree))
+
+        # Per-target sums are differences of running totals at the
+        # CSR row offsets
+        totals = list(accumulate(map(shares.__getitem__, self.sources), initial=0.0))
+        starts = map(totals.__getitem__, self.offsets[:-1])
+        ends = map(totals.__getitem__, self.offsets[1:])
+        return list(map(sub, ends, starts))
+
+    def pagerank(self, damping_factor, tolerance=0.001, ranks=None):
+        """
+        Return the list of PageRank values by power iteration, starting
+        from `ranks` or the uniform distribution, until no value
+        changes by more than `tolerance`.
+        """
+        n = len(self.pages)
+        if ranks is None:
+            ranks = [1 / n] * n
+        while True:
+            new_ranks = self.step(ranks, damping_factor)
+            change = max(abs(new - old) for new, old in zip(new_ranks, ranks))
+            ranks = new_ranks
+            if change <= tolerance:
+                return ranks
+
+    def out_links(self):
+        """
+        Return CSR arrays of outgoing links, (offsets, targets), such
+        that page i links to targets[offsets[i]:offsets[i + 1]].
+        """
+        if self.outgoing is None:
+            offsets = array("i", [0])
+            offsets.extend(accumulate(self.out_degree))
+            targets = array("i", bytes(4 * len(self.sources)))
+            fill = array("i", offsets[:-1])
+            for target in range(len(self.pages)):
+                for source in self.sources[self.offsets[target]:self.offsets[target + 1]]:
+                    targets[fill[source]] = target
+                    fill[source] += 1
+            self.outgoing = offsets, targets
+        return self.outgoing
+
+    def sample(self, damping_factor, n, seed=None, surfers=SURFERS):
+        """
+        Return PageRank values estimated from `n` pages visited by
+        random surfers, each starting on a page at random. Runs with
+        the same `seed` visit the same pages.
+
+        There are at most `surfers`, and few enough that each visits at
+        least MIN_WALK pages. Every surfer first takes burn-in steps that
+        are not counted, until the influence of its random start has
+        shrunk by `damping_factor` per step to BURN_IN_ERROR.
+        """
+        rng = random.Random(seed)
+        rand = rng.random
+        size = len(self.pages)
+        offsets, targets = self.out_links()
+        starts = offsets.tolist()
+        degrees = self.out_degree.tolist()
+
+        def step(positions):
+            # Follow a random link with probability `damping_factor`,
+            # otherwise, or from a page without links, jump anywhere
+            return [
+                targets[starts[page] + int(rand() * degrees[page])]
+                if degrees[page] and rand() < damping_factor
+                else int(rand() * size)
+                for page in positions
+            ]
+
+        positions = [int(rand() * size) for _ in range(min(surfers, max(1, n // MIN_WALK)))]
+        if 0 < damping_factor < 1:
+            for _ in range(math.ceil(math.log(BURN_IN_ERROR) / math.log(damping_factor))):
+                positions = step(positions)
+
+        counts = Counter()
+        remaining = n
+        while remaining > 0:
+            if remaining < len(positions):
+                positions = positions[:remaining]
+            counts.update(positions)
+            remaining -= len(positions)
+            positions = step(positions)
+        return [counts[i] / n for i in range(size)]
+
+    def to_dict(self, ranks):
+        return dict(zip(self.pages, ranks))
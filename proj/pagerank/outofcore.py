@@ -0,0 +1,162 @@
+"""
+Out-of-core PageRank over an on-disk edge list.
+
+`write_edges` crawls a directory one page at a time into a binary file:
+a header, every link as an int32 (source, target) pair of page numbers,
+then the page names. `iterate` memory-maps that file and streams the
+edges through in blocks on every iteration, so only the page names,
+out-degrees and rank vectors stay in memory, never the link graph.
+
+Usage: python outofcore.py corpus [edges]
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import Counter
+from operator import mul
+
+import crawler
+
+MAGIC = b"PREDGES\0"
+VERSION = 1
+FILENAME = ".pagerank-edges"
+HEADER = struct.Struct("<8sIcB2xqq")
+
+# Edges read from the file at a time
+BLOCK = 1 << 16
+
+
+def path_for(directory):
+    return os.path.join(directory, FILENAME)
+
+
+def write_edges(directory, filename=None):
+    """
+    Write the links between the .html pages in `directory` as an edge
+    list, by default next to the pages. Return (pages, edges).
+    """
+    filename = filename or path_for(directory)
+    names = sorted(crawler.scan(directory))
+    index = {name: i for i, name in enumerate(names)}
+
+    tmp = f"{filename}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(bytes(HEADER.size))
+            edges = 0
+            for source, name in enumerate(names):
+                targets = sorted({index[link] for link in crawler.parse(os.path.join(directory, name))
+                                  if link in index and link != name})
+                pairs = array("i", [0]) * (2 * len(targets))
+                pairs[0::2] = array("i", [source]) * len(targets)
+                pairs[1::2] = array("i", targets)
+                f.write(pairs.tobytes())
+                edges += len(targets)
+            for name in names:
+                f.write(name.encode("utf-8") + b"\n")
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, VERSION, sys.byteorder[0].encode(),
+                                array("i").itemsize, len(names), edges))
+        os.replace(tmp, filename)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    return len(names), edges
+
+
+def read_header(data):
+    """
+    Return (pages, edges) from the header of an edge list, raising
+    ValueError if it is not one this platform can read.
+    """
+    magic, version, byteorder, itemsize, n, m = HEADER.unpack_from(data, 0)
+    if (magic != MAGIC or version != VERSION or
+            byteorder != sys.byteorder[0].encode() or
+            itemsize != array("i").itemsize):
+        raise ValueError("not a pagerank edge list for this platform")
+    return n, m
+
+
+def blocks(data, m):
+    """
+    Yield the edges as (sources, targets) arrays of up to BLOCK edges.
+    """
+    pos = HEADER.size
+    end = pos + 8 * m
+    while pos < end:
+        chunk = array("i")
+        chunk.frombytes(data[pos:min(pos + 8 * BLOCK, end)])
+        pos += 8 * BLOCK
+        yield chunk[0::2], chunk[1::2]
+
+
+def iterate(filename, damping_factor, tolerance=0.001):
+    """
+    Return PageRank values as an array("d") in page-name order, by the
+    same power iteration and stopping rule as `iterate_pagerank`.
+    """
+    with open(filename, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        n, m = read_header(data)
+
+        degrees = Counter()
+        for sources, _ in blocks(data, m):
+            degrees.update(sources)
+        inverse_degree = array("d", [1 / degrees[i] if degrees[i] else 0.0 for i in range(n)])
+        dangling = array("i", [i for i in range(n) if not degrees[i]])
+        del degrees
+
+        ranks = array("d", [1 / n]) * n
+        while True:
+            shares = array("d", map(mul, ranks, inverse_degree))
+            base = (1 - damping_factor) / n + damping_factor * sum(map(ranks.__getitem__, dangling)) / n
+            totals = array("d", bytes(8 * n))
+            for sources, targets in blocks(data, m):
+                for source, target in zip(sources, targets):
+                    totals[target] += shares[source]
+
+            new_ranks = array("d", [base + damping_factor * total for total in totals])
+            change = max(map(abs, map(float.__sub__, new_ranks, ranks)))
+            ranks = new_ranks
+            if change <= tolerance:
+                return ranks
+
+
+def page_names(filename):
+    """
+    Return the page names stored in an edge list, in page-number order.
+    """
+    with open(filename, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        n, m = read_header(data)
+        names = data[HEADER.size + 8 * m:].decode("utf-8").split("\n")
+    return names[:n]
+
+
+def iterate_pagerank(filename, damping_factor):
+    """
+    Return the {page: rank} dictionary of `iterate` for an edge list.
+    """
+    return dict(zip(page_names(filename), iterate(filename, damping_factor)))
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python outofcore.py corpus [edges]")
+    filename = sys.argv[2] if len(sys.argv) == 3 else path_for(sys.argv[1])
+    pages, edges = write_edges(sys.argv[1], filename)
+    print(f"Wrote {pages} pages and {edges} links to {filename}")
+
+    ranks = iterate(filename, 0.85)
+    names = page_names(filename)
+    print("Top pages from out-of-core iteration")
+    for i in sorted(range(pages), key=lambda i: -ranks[i])[:10]:
+        print(f"  {names[i]}: {ranks[i]:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Personalized PageRank for many teleport vectors.
+
+A teleport vector replaces the uniform jump of PageRank: with
+probability 1 - d, and from pages without links, the surfer jumps to a
+page drawn from the vector instead of any page. Every vector is solved
+by its own power iteration over one shared link matrix, so the CSR
+arrays are built once for all of them, but N vectors still cost N
+solves. Each vector is dropped as soon as its own ranks converge.
+"""
+
+from array import array
+from operator import sub
+
+# Bound on the L1 change of a vector's ranks in its last iteration
+TOLERANCE = 1e-6
+
+# Iterations after which a vector is left as it is
+MAX_ITERATIONS = 1000
+
+
+def personalized_pagerank(matrix, teleports, damping_factor,
+                          tolerance=TOLERANCE, stats=None):
+    """
+    Return the personalized ranks of every teleport vector in one flat
+    array("d"): the ranks for teleports[j] are result[j * N:(j + 1) * N],
+    in the page order of `matrix`. A teleport vector is a dict mapping
+    pages to weights, or a collection of pages weighted equally.
+    `stats`, if given, receives the iterations each vector took.
+    """
+    n = len(matrix)
+    d = damping_factor
+    vectors = [teleport_vector(matrix, teleport) for teleport in teleports]
+
+    result = array("d", bytes(8 * n * len(vectors)))
+    ranks = {}
+    for j, vector in enumerate(vectors):
+        ranks[j] = [0.0] * n
+        for page, weight in vector:
+            ranks[j][page] = weight
+    iterations = [0] * len(vectors)
+
+    # One round steps every unconverged vector once, each with its own
+    # pass over the link matrix; converged vectors are written out and
+    # dropped
+    while ranks:
+        for j in list(ranks):
+            old = ranks[j]
+            dangling = sum(map(old.__getitem__, matrix.dangling))
+            new = [d * total for total in matrix.propagate(old)]
+            jump = 1 - d + d * dangling
+            for page, weight in vectors[j]:
+                new[page] += jump * weight
+            iterations[j] += 1
+
+            change = sum(map(abs, map(sub, new, old)))
+            if change <= tolerance or iterations[j] >= MAX_ITERATIONS:
+                result[j * n:(j + 1) * n] = array("d", new)
+                del ranks[j]
+            else:
+                ranks[j] = new
+
+    if stats is not None:
+        stats["iterations"] = iterations
+    return result
+
+
+def teleport_vector(matrix, teleport):
+    """
+    Return a teleport vector as a list of (page index, weight) pairs
+    with weights summing to 1.
+    """
+    if isinstance(teleport, dict):
+        pairs = [(matrix.index[page], weight) for page, weight in teleport.items() if weight]
+    else:
+        pairs = [(matrix.index[page], 1) for page in set(teleport)]
+    total = sum(weight for _, weight in pairs)
+    if not pairs or total <= 0:
+        raise ValueError("teleport vector must give some page a positive weight")
+    return [(page, weight / total) for page, weight in pairs]
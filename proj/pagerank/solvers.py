@@ -0,0 +1,152 @@
+"""
+PageRank solvers with convergence diagnostics.
+
+Every solver runs until the L1 norm of the change in the normalised
+ranks over one iteration is at most `tolerance`, or for
+`max_iterations`. It returns the ranks with a diagnostics dict that
+holds the solver name, iterations, the residual of every iteration,
+wall-clock seconds, and whether it converged.
+"""
+
+import time
+from operator import mul, sub
+
+# Default L1 residual at which a solver stops
+TOLERANCE = 1e-6
+
+# Default limit on iterations
+MAX_ITERATIONS = 200
+
+# Power iterations between two extrapolation steps
+EXTRAPOLATE_EVERY = 10
+
+
+def solve(matrix, damping_factor, solver="power",
+          tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS):
+    """
+    Return (ranks, diagnostics) from the solver named `solver`, one of
+    SOLVERS, with ranks listed in the page order of `matrix`.
+    """
+    if solver not in SOLVERS:
+        raise ValueError(f"unknown solver {solver!r}, expected one of {', '.join(SOLVERS)}")
+    diagnostics = {"solver": solver, "iterations": 0, "residuals": [],
+                   "seconds": 0.0, "converged": False}
+    start = time.perf_counter()
+    ranks = SOLVERS[solver](matrix, damping_factor, tolerance, max_iterations, diagnostics)
+    diagnostics["seconds"] = time.perf_counter() - start
+    diagnostics["iterations"] = len(diagnostics["residuals"])
+    return ranks, diagnostics
+
+
+def power(matrix, damping_factor, tolerance, max_iterations, diagnostics):
+    """
+    Plain power iteration from the uniform distribution.
+    """
+    n = len(matrix)
+    ranks = [1 / n] * n
+    for _ in range(max_iterations):
+        new_ranks = matrix.step(ranks, damping_factor)
+        residual = l1(new_ranks, ranks)
+        ranks = new_ranks
+        diagnostics["residuals"].append(residual)
+        if residual <= tolerance:
+            diagnostics["converged"] = True
+            break
+    return ranks
+
+
+def extrapolated(matrix, damping_factor, tolerance, max_iterations, diagnostics):
+    """
+    Power iteration that every EXTRAPOLATE_EVERY iterations jumps
+    towards the limit. When the error shrinks by a steady factor r per
+    iteration, as the ratio of the last two residuals estimates, the
+    limit is (x_k - r * x_(k-1)) / (1 - r). A jump is kept only if the
+    iteration after it has a smaller residual; otherwise extrapolation
+    is given up.
+    """
+    n = len(matrix)
+    residuals = diagnostics["residuals"]
+    ranks = [1 / n] * n
+    extrapolating = True
+    while len(residuals) < max_iterations:
+        new_ranks = matrix.step(ranks, damping_factor)
+        residual = l1(new_ranks, ranks)
+        residuals.append(residual)
+        if residual <= tolerance:
+            diagnostics["converged"] = True
+            return new_ranks
+
+        ratio = residual / residuals[-2] if len(residuals) > 1 else 0.0
+        if (extrapolating and len(residuals) % EXTRAPOLATE_EVERY == 0 and
+                0 < ratio < 1 and len(residuals) < max_iterations):
+            jumped = normalize([max(0.0, (new - ratio * old) / (1 - ratio))
+                                for new, old in zip(new_ranks, ranks)])
+            following = matrix.step(jumped, damping_factor)
+            jumped_residual = l1(following, jumped)
+            residuals.append(jumped_residual)
+            if jumped_residual < residual:
+                new_ranks = following
+                if jumped_residual <= tolerance:
+                    diagnostics["converged"] = True
+                    return new_ranks
+            else:
+                extrapolating = False
+        ranks = new_ranks
+    return ranks
+
+
+def gauss_seidel(matrix, damping_factor, tolerance, max_iterations, diagnostics):
+    """
+    Gauss-Seidel sweeps: pages are updated in turn, each from the
+    newest ranks of the pages linking to it and the current rank mass
+    of dangling pages.
+    """
+    n = len(matrix)
+    d = damping_factor
+    offsets, sources = matrix.offsets, matrix.sources
+    inverse_degree = matrix.inverse_degree
+    is_dangling = bytearray(n)
+    for i in matrix.dangling:
+        is_dangling[i] = 1
+
+    ranks = [1 / n] * n
+    shares = list(map(mul, ranks, inverse_degree))
+    dangling = sum(map(ranks.__getitem__, matrix.dangling))
+    for _ in range(max_iterations):
+        old_ranks = list(ranks)
+        for i in range(n):
+            rank = ((1 - d) + d * dangling) / n + d * sum(
+                map(shares.__getitem__, sources[offsets[i]:offsets[i + 1]]))
+            if is_dangling[i]:
+                dangling += rank - ranks[i]
+            ranks[i] = rank
+            shares[i] = rank * inverse_degree[i]
+
+        # Sweeps do not preserve the total exactly
+        total = sum(ranks)
+        ranks = [rank / total for rank in ranks]
+        shares = list(map(mul, ranks, inverse_degree))
+        dangling = sum(map(ranks.__getitem__, matrix.dangling))
+
+        residual = l1(ranks, old_ranks)
+        diagnostics["residuals"].append(residual)
+        if residual <= tolerance:
+            diagnostics["converged"] = True
+            break
+    return ranks
+
+
+def normalize(ranks):
+    total = sum(ranks)
+    return [rank / total for rank in ranks]
+
+
+def l1(a, b):
+    return sum(map(abs, map(sub, a, b)))
+
+
+SOLVERS = {
+    "power": power,
+    "gauss-seidel": gauss_seidel,
+    "extrapolated": extrapolated,
+}
@@ -0,0 +1,60 @@
+import time
+
+import bitboard
+import tictactoe as ttt
+
+# Positions to search, as moves played from the empty board
+OPENINGS = [
+    [],
+    [(1, 1)],
+    [(0, 0), (1, 1)],
+    [(0, 0), (1, 1), (2, 2)],
+]
+
+
+def position(moves):
+    board = ttt.initial_state()
+    for move in moves:
+        board = ttt.result(board, move)
+    return board
+
+
+def measure(search, board, repeat, stats):
+    """
+    Returns (nodes of the first call, seconds of the first call, mean
+    seconds per later call) for `search` on `board`, counting nodes in
+    `stats`.
+    """
+    stats["nodes"] = 0
+    start = time.perf_counter()
+    search(board)
+    first = time.perf_counter() - start
+    nodes = stats["nodes"]
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        search(board)
+    warm = (time.perf_counter() - start) / repeat
+    return nodes, first, warm
+
+
+def main():
+    print(f"{'moves':>5}  {'search':<10}{'nodes':>8}{'first ms':>10}{'warm us':>10}")
+    for moves in OPENINGS:
+        board = position(moves)
+        ttt.transpositions.clear()
+        ttt.best_actions.clear()
+        bitboard.table.clear()
+        bitboard.best_moves.clear()
+        for name, search, repeat, stats in (
+                ("alphabeta", ttt.alphabeta, 3, ttt.stats),
+                ("memoized", ttt.search, 1000, ttt.stats),
+                ("book", ttt.minimax, 1000, ttt.stats),
+                ("bitboard", bitboard.minimax, 1000, bitboard.stats)):
+            nodes, first, warm = measure(search, board, repeat, stats)
+            print(f"{len(moves):>5}  {name:<10}{nodes:>8}"
+                  f"{first * 1e3:>10.2f}{warm * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Tic Tac Toe engine on bitboards.
+
+A position is a pair of 9-bit integers (x, o): bit 3 * i + j is set
+when that player holds cell (i, j). The list-of-lists functions at the
+bottom adapt it to the interface of tictactoe, so runner.py can use
+either module.
+"""
+
+from tictactoe import X, O, EMPTY, LINES, SYMMETRIES
+
+FULL = 0b111111111
+
+# The 8 winning lines as bit masks
+WIN_MASKS = tuple(sum(1 << i for i in line) for line in LINES)
+
+# For each symmetry, the image of every 9-bit mask under it
+PERMUTED = tuple(
+    tuple(sum(1 << i for i in range(9) if mask >> symmetry[i] & 1)
+          for mask in range(1 << 9))
+    for symmetry in SYMMETRIES
+)
+
+# Minimax value for X of positions already solved, keyed by canonical key
+table = {}
+
+# Optimal move bit of positions already asked about, keyed by (x, o)
+best_moves = {}
+
+# Search counters, reset by callers that want to measure a search
+stats = {"nodes": 0}
+
+
+def count(bits):
+    return bin(bits).count("1")
+
+
+def to_move(x, o):
+    """
+    Returns X or O, whoever moves next.
+    """
+    return X if count(x) == count(o) else O
+
+
+def moves(x, o):
+    """
+    Yields the bit of every empty cell.
+    """
+    free = ~(x | o) & FULL
+    while free:
+        bit = free & -free
+        yield bit
+        free ^= bit
+
+
+def play(x, o, bit):
+    """
+    Returns the position after the side to move takes cell `bit`.
+    """
+    if count(x) == count(o):
+        return x | bit, o
+    return x, o | bit
+
+
+def won(bits):
+    for mask in WIN_MASKS:
+        if bits & mask == mask:
+            return True
+    return False
+
+
+def canonical(x, o):
+    """
+    Returns one key shared by all 8 symmetric images of a position.
+    """
+    return min(p[x] << 9 | p[o] for p in PERMUTED)
+
+
+def value(x, o):
+    """
+    Returns the minimax value of a position for X: 1, 0 or -1.
+    """
+    if won(x):
+        return 1
+    if won(o):
+        return -1
+    if x | o == FULL:
+        return 0
+
+    key = canonical(x, o)
+    result = table.get(key)
+    if result is not None:
+        return result
+
+    stats["nodes"] += 1
+    children = (value(*play(x, o, bit)) for bit in moves(x, o))
+    result = max(children) if count(x) == count(o) else min(children)
+    table[key] = result
+    return result
+
+
+def best_move(x, o):
+    """
+    Returns the bit of an optimal move for the side to move, or None
+    if the game is over.
+    """
+    if (x, o) in best_moves:
+        return best_moves[x, o]
+    if won(x) or won(o) or x | o == FULL:
+        return None
+
+    maximizing = count(x) == count(o)
+    best = best_value = None
+    for bit in moves(x, o):
+        result = value(*play(x, o, bit))
+        if best_value is None or (result > best_value if maximizing else result < best_value):
+            best, best_value = bit, result
+    best_moves[x, o] = best
+    return best
+
+
+def to_bits(board):
+    """
+    Returns the (x, o) bitboards of a list-of-lists board.
+    """
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def from_bits(x, o):
+    """
+    Returns the list-of-lists board of (x, o) bitboards.
+    """
+    return [[X if x >> (3 * i + j) & 1 else O if o >> (3 * i + j) & 1 else EMPTY
+             for j in range(3)]
+            for i in range(3)]
+
+
+def to_action(bit):
+    return divmod(bit.bit_length() - 1, 3)
+
+
+def initial_state():
+    return from_bits(0, 0)
+
+
+def player(board):
+    return to_move(*to_bits(board))
+
+
+def actions(board):
+    return {to_action(bit) for bit in moves(*to_bits(board))}
+
+
+def result(board, action):
+    i, j = action
+    if not (0 <= i < 3 and 0 <= j < 3) or board[i][j] is not EMPTY:
+        raise Exception("invalid action")
+    return from_bits(*play(*to_bits(board), 1 << (3 * i + j)))
+
+
+def winner(board):
+    x, o = to_bits(board)
+    if won(x):
+        return X
+    if won(o):
+        return O
+    return None
+
+
+def terminal(board):
+    x, o = to_bits(board)
+    return won(x) or won(o) or x | o == FULL
+
+
+def utility(board):
+    x, o = to_bits(board)
+    return 1 if won(x) else -1 if won(o) else 0
+
+
+def minimax(board):
+    bit = best_move(*to_bits(board))
+    return None if bit is None else to_action(bit)
@@ -0,0 +1,92 @@
+"""
+Writes the tictactoe opening book: the optimal move of every position
+reachable from the empty board, indexed by tictactoe.book_index.
+
+Usage: python book.py [--verify]
+
+With --verify, checks instead that every move in the book keeps the
+value a full search gives the position.
+"""
+
+import sys
+
+import tictactoe as ttt
+
+
+def reachable():
+    """
+    Returns every non-terminal position reachable from the empty
+    board, keyed by book index.
+    """
+    positions = {}
+    frontier = [ttt.initial_state()]
+    while frontier:
+        board = frontier.pop()
+        index = ttt.book_index(board)
+        if index in positions or ttt.terminal(board):
+            continue
+        positions[index] = board
+        for action in ttt.actions(board):
+            frontier.append(ttt.result(board, action))
+    return positions
+
+
+def build():
+    book = bytearray([ttt.NO_MOVE]) * ttt.BOOK_SIZE
+    for index, board in reachable().items():
+        i, j = ttt.search(board)
+        book[index] = 3 * i + j
+    return bytes(book)
+
+
+def value(board, values):
+    """
+    Returns the minimax value of a board by full search, independent of
+    the engine's symmetry tables; `values` caches positions already seen.
+    """
+    index = ttt.book_index(board)
+    if index not in values:
+        if ttt.terminal(board):
+            values[index] = ttt.utility(board)
+        else:
+            children = [value(ttt.result(board, action), values)
+                        for action in ttt.actions(board)]
+            values[index] = max(children) if ttt.player(board) == ttt.X else min(children)
+    return values[index]
+
+
+def verify():
+    """
+    Returns the number of reachable positions whose book move is
+    missing or worse than the search's.
+    """
+    book = ttt.load_book()
+    if not book:
+        sys.exit(f"No book at {ttt.BOOK}, run python book.py first")
+
+    values = {}
+    errors = 0
+    for index, board in reachable().items():
+        move = book[index]
+        if move == ttt.NO_MOVE or value(board, values) != value(
+                ttt.result(board, divmod(move, 3)), values):
+            errors += 1
+    return errors
+
+
+def main():
+    if sys.argv[1:] == ["--verify"]:
+        errors = verify()
+        print(f"{errors} positions disagree with search")
+        sys.exit(1 if errors else 0)
+    if sys.argv[1:]:
+        sys.exit("Usage: python book.py [--verify]")
+
+    book = build()
+    with open(ttt.BOOK, "wb") as f:
+        f.write(book)
+    print(f"Wrote {sum(move != ttt.NO_MOVE for move in book)} positions to {ttt.BOOK}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+"""
+Generalised m,n,k tic-tac-toe: an m x n board won by k in a row.
+
+Game offers the functions of tictactoe on m x n list-of-lists boards.
+Its minimax runs iterative deepening alpha-beta under a time budget.
+When the search is cut off before the game ends, positions are scored
+by evaluate.
+"""
+
+import random
+import sys
+import time
+
+from tictactoe import X, O, EMPTY
+
+# Score of a won position; wins found sooner score higher
+WIN = 1000000
+
+# Nodes searched between two looks at the clock
+CLOCK_INTERVAL = 1024
+
+# Transposition table entries kept before the table is cleared
+MAX_TABLE = 1 << 20
+
+# Transposition table bounds
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class Timeout(Exception):
+    pass
+
+
+class Position():
+    """
+    A board being searched, kept as flat cells of 1 (X), -1 (O) or 0.
+    Every k-in-a-row window keeps its count of X and O pieces, so that
+    moves update the evaluation and detect wins in O(windows per cell).
+    """
+
+    def __init__(self, game, cells):
+        self.game = game
+        self.cells = [0] * game.size
+        self.x_counts = [0] * len(game.lines)
+        self.o_counts = [0] * len(game.lines)
+        self.score = 0
+        self.hash = 0
+        self.filled = 0
+        for i, cell in enumerate(cells):
+            if cell:
+                self.color = cell
+                self.play(i)
+        self.color = 1 if cells.count(1) == cells.count(-1) else -1
+
+    def play(self, i):
+        """
+        Places the piece of the side to move on cell `i`, and returns
+        True if that completes k in a row.
+        """
+        game = self.game
+        color = self.color
+        mine, theirs = (self.x_counts, self.o_counts) if color == 1 else (self.o_counts, self.x_counts)
+        weights = game.weights
+        won = False
+        for line in game.cell_lines[i]:
+            count = mine[line]
+            if not theirs[line]:
+                self.score += color * (weights[count + 1] - weights[count])
+            elif not count:
+                # The line was theirs and is now blocked
+                self.score += color * weights[theirs[line]]
+            mine[line] = count + 1
+            if count + 1 == game.k:
+                won = True
+        self.cells[i] = color
+        self.hash ^= game.keys[i][color == 1]
+        self.filled += 1
+        self.color = -color
+        return won
+
+    def undo(self, i):
+        game = self.game
+        color = self.cells[i]
+        mine, theirs = (self.x_counts, self.o_counts) if color == 1 else (self.o_counts, self.x_counts)
+        weights = game.weights
+        for line in game.cell_lines[i]:
+            count = mine[line] - 1
+            mine[line] = count
+            if not theirs[line]:
+                self.score -= color * (weights[count + 1] - weights[count])
+            elif not count:
+                self.score -= color * weights[theirs[line]]
+        self.cells[i] = 0
+        self.hash ^= game.keys[i][color == 1]
+        self.filled -= 1
+        self.color = color
+
+    def urgency(self, i):
+        """
+        Returns how much the lines through empty cell `i` matter to
+        either side, used to try promising moves first.
+        """
+        weights = self.game.weights
+        total = 0
+        for line in self.game.cell_lines[i]:
+            x, o = self.x_counts[line], self.o_counts[line]
+            if not o:
+                total += weights[x]
+            if not x:
+                total += weights[o]
+        return total
+
+
+class Game():
+
+    def __init__(self, m=3, n=3, k=3, budget=1.0, max_depth=None):
+        if not 1 <= k <= max(m, n):
+            raise ValueError(f"cannot get {k} in a row on {m}x{n}")
+        self.m = m
+        self.n = n
+        self.k = k
+        self.size = m * n
+        self.budget = budget
+        self.max_depth = max_depth or self.size
+
+        # Every window of k cells in a row, column or diagonal
+        self.lines = []
+        for i in range(m):
+            for j in range(n):
+                for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_i, end_j = i + di * (k - 1), j + dj * (k - 1)
+                    if 0 <= end_i < m and 0 <= end_j < n:
+                        self.lines.append(tuple((i + di * s) * n + j + dj * s for s in range(k)))
+        self.cell_lines = [[] for _ in range(self.size)]
+        for line, cells in enumerate(self.lines):
+            for cell in cells:
+                self.cell_lines[cell].append(line)
+
+        # A line with c pieces of one side only is worth weights[c] to it
+        self.weights = [0] + [4 ** c for c in range(k - 1)] + [0]
+
+        # Central cells first, as they lie on the most lines
+        self.order = sorted(range(self.size),
+                            key=lambda i: (-len(self.cell_lines[i]), i))
+
+        generator = random.Random(f"{m},{n},{k}")
+        self.keys = [(generator.getrandbits(64), generator.getrandbits(64))
+                     for _ in range(self.size)]
+        self.table = {}
+        self.stats = {"nodes": 0, "depth": 0}
+
+    def initial_state(self):
+        return [[EMPTY] * self.n for _ in range(self.m)]
+
+    def cells(self, board):
+        """
+        Returns the flat cells of a board: 1 for X, -1 for O, 0 if empty.
+        """
+        return [1 if cell == X else -1 if cell == O else 0
+                for row in board for cell in row]
+
+    def player(self, board):
+        numX = sum(row.count(X) for row in board)
+        numO = sum(row.count(O) for row in board)
+        return O if numX > numO else X
+
+    def actions(self, board):
+        return {(i, j) for i in range(self.m) for j in range(self.n)
+                if board[i][j] is EMPTY}
+
+    def result(self, board, action):
+        i, j = action
+        if not (0 <= i < self.m and 0 <= j < self.n) or board[i][j] is not EMPTY:
+            raise Exception("invalid action")
+        new_board = [row[:] for row in board]
+        new_board[i][j] = self.player(board)
+        return new_board
+
+    def winner(self, board):
+        cells = self.cells(board)
+        for line in self.lines:
+            total = sum(cells[i] for i in line)
+            if total == self.k:
+                return X
+            if total == -self.k:
+                return O
+        return None
+
+    def terminal(self, board):
+        return (self.winner(board) is not None or
+                all(cell is not EMPTY for row in board for cell in row))
+
+    def utility(self, board):
+        winner = self.winner(board)
+        return 1 if winner == X else -1 if winner == O else 0
+
+    def evaluate(self, board):
+        """
+        Returns the heuristic score of a board for X: the weight of
+        every line X could still complete, minus the same for O.
+        """
+        return Position(self, self.cells(board)).score
+
+    def minimax(self, board, budget=None):
+        """
+        Returns the best action found for the player to move within
+        `budget` seconds, or None if the game is over.
+        """
+        if self.terminal(board):
+            return None
+        move, _ = self.search(self.cells(board), budget)
+        return divmod(move, self.n)
+
+    def search(self, cells, budget=None):
+        """
+        Returns (cell, score for the side to move) for flat `cells` from
+        iterative deepening: each depth is searched in full, best move of
+        the previous depth first, until time runs out or the game is solved.
+        """
+        position = Position(self, cells)
+        budget = self.budget if budget is None else budget
+        self.deadline = time.perf_counter() + budget
+        self.stats["nodes"] = 0
+        if len(self.table) > MAX_TABLE:
+            self.table.clear()
+
+        moves = self.ordered_moves(position, None)
+        best, best_score = moves[0], None
+        empty = self.size - position.filled
+        for depth in range(1, min(self.max_depth, empty) + 1):
+            try:
+                score, move = self.root(position, moves, depth)
+            except Timeout:
+                break
+            best, best_score = move, score
+            self.stats["depth"] = depth
+            moves.remove(move)
+            moves.insert(0, move)
+            if abs(score) >= WIN - self.size:
+                break
+        return best, best_score
+
+    def root(self, position, moves, depth, alpha=-WIN - 1, beta=WIN + 1):
+        """
+        Returns (score, move) of the best of `moves`, searched to `depth`;
+        the first of equally good moves wins.
+        """
+        best = None
+        for move in moves:
+            if position.play(move):
+                score = WIN - 1
+            else:
+                score = -self.negamax(position, depth - 1, -beta, -alpha, 1)
+            position.undo(move)
+            if best is None or score > alpha:
+                alpha = max(alpha, score)
+                best = move
+                if alpha >= beta:
+                    break
+        return alpha, best
+
+    def negamax(self, position, depth, alpha, beta, ply):
+        """
+        Returns the score of `position` for the side to move, exact
+        when it lies between `alpha` and `beta`.
+        """
+        stats = self.stats
+        stats["nodes"] += 1
+        if stats["nodes"] % CLOCK_INTERVAL == 0 and time.perf_counter() > self.deadline:
+            raise Timeout
+        if position.filled == self.size:
+            return 0
+        if depth == 0:
+            return position.color * position.score
+
+        entry = self.table.get(position.hash)
+        tt_move = None
+        if entry is not None:
+            entry_depth, value, bound, tt_move = entry
+            # Only entries of the same depth are reused, so that a score
+            # depends on the position and depth alone, whatever was
+            # searched before
+            if entry_depth == depth:
+                # Wins are stored relative to this node, not the root
+                if value > WIN - self.size:
+                    value -= ply
+                elif value < self.size - WIN:
+                    value += ply
+                if (bound == EXACT or (bound == LOWER and value >= beta) or
+                        (bound == UPPER and value <= alpha)):
+                    return value
+
+        original_alpha = alpha
+        best = -WIN - 1
+        best_move = None
+        for move in self.ordered_moves(position, tt_move):
+            if position.play(move):
+                score = WIN - ply - 1
+            else:
+                score = -self.negamax(position, depth - 1, -beta, -alpha, ply + 1)
+            position.undo(move)
+            if score > best:
+                best = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        stored = best
+        if stored > WIN - self.size:
+            stored += ply
+        elif stored < self.size - WIN:
+            stored -= ply
+        bound = UPPER if best <= original_alpha else LOWER if best >= beta else EXACT
+        self.table[position.hash] = (depth, stored, bound, best_move)
+        return best
+
+    def ordered_moves(self, position, first):
+        """
+        Returns the empty cells, `first` and then the most urgent ones
+        first.
+        """
+        cells = position.cells
+        moves = sorted((i for i in self.order if not cells[i]),
+                       key=position.urgency, reverse=True)
+        if first is not None and not cells[first]:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
+
+
+def main():
+    if len(sys.argv) not in (4, 5):
+        sys.exit("Usage: python mnk.py m n k [seconds]")
+    m, n, k = map(int, sys.argv[1:4])
+    game = Game(m, n, k, float(sys.argv[4]) if len(sys.argv) == 5 else 1.0)
+
+    board = game.initial_state()
+    while not game.terminal(board):
+        move = game.minimax(board)
+        print(f"{game.player(board)} plays {move} "
+              f"(depth {game.stats['depth']}, {game.stats['nodes']} nodes)")
+        board = game.result(board, move)
+    for row in board:
+        print(" ".join(cell or "." for cell in row))
+    winner = game.winner(board)
+    print(f"Winner: {winner}" if winner else "Tie")
+
+
+if __name__ == "__main__":
+    main()
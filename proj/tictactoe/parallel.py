@@ -0,0 +1,163 @@
+"""
+Root-parallel search for m,n,k games.
+
+The moves at the root are searched by a process pool, each worker with
+its own mnk.Game and transposition table. Workers publish the best root
+score found so far in a shared value, and later root moves are searched
+with it as their alpha bound.
+
+Usage: python parallel.py m n k depth [workers]
+prints the speed-up of 1 to `workers` processes on the empty board.
+"""
+
+import math
+import multiprocessing
+import sys
+import time
+
+import mnk
+
+# The worker's game and the shared best root score, set by init_worker
+game = None
+alpha = None
+
+
+class RootParallel():
+    """
+    A pool of `workers` processes searching root moves of `game`.
+
+    The move chosen at a given depth does not depend on the number of
+    workers or on timing: every move is searched with a window whose
+    lower bound is one below the best score shared at the time, so a
+    move that ties the best gets its exact score, and a worse move
+    scores below the best. Of the moves with the best score, the first
+    in root order is chosen, as the sequential search does.
+    """
+
+    def __init__(self, game, workers):
+        self.game = game
+        context = multiprocessing.get_context()
+        self.alpha = context.Value("q", 0)
+        self.pool = context.Pool(
+            workers, initializer=init_worker,
+            initargs=(game.m, game.n, game.k, self.alpha))
+        self.stats = {"nodes": 0, "depth": 0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def search(self, cells, max_depth=None, budget=None):
+        """
+        Returns (cell, score for the side to move) for flat `cells` by
+        iterative deepening up to `max_depth`, for at most `budget`
+        seconds. Without a budget the result is reproducible.
+        """
+        game = self.game
+        deadline = math.inf if budget is None else time.perf_counter() + budget
+        self.stats["nodes"] = 0
+        self.stats["depth"] = 0
+
+        position = mnk.Position(game, cells)
+        moves = game.ordered_moves(position, None)
+        best, best_score = moves[0], None
+        empty = game.size - position.filled
+        for depth in range(1, min(max_depth or game.max_depth, empty) + 1):
+            found = self.root(cells, moves, depth, deadline)
+            if found is None:
+                break
+            best, best_score = found
+            self.stats["depth"] = depth
+            moves.remove(best)
+            moves.insert(0, best)
+            if abs(best_score) >= mnk.WIN - game.size:
+                break
+        return best, best_score
+
+    def root(self, cells, moves, depth, deadline):
+        """
+        Returns (move, score) of the best of `moves` searched to `depth`,
+        or None if time ran out. The first move is searched alone, so
+        that the others start with its score as their bound.
+        """
+        self.alpha.value = -mnk.WIN - 1
+        tasks = [(cells, move, depth, deadline) for move in moves]
+        results = [self.pool.apply(search_move, (tasks[0],))]
+        results.extend(self.pool.map(search_move, tasks[1:], chunksize=1))
+        if None in results:
+            return None
+
+        self.stats["nodes"] += sum(nodes for _, nodes in results)
+        scores = [score for score, _ in results]
+        best = max(range(len(moves)), key=lambda i: (scores[i], -i))
+        return moves[best], scores[best]
+
+
+def init_worker(m, n, k, shared):
+    global game, alpha
+    game = mnk.Game(m, n, k)
+    alpha = shared
+
+
+def search_move(task):
+    """
+    Returns (score, nodes) of one root move for the side to move, or
+    None if the deadline passed.
+    """
+    cells, move, depth, deadline = task
+    position = mnk.Position(game, cells)
+    game.deadline = deadline
+    game.stats["nodes"] = 0
+    if len(game.table) > mnk.MAX_TABLE:
+        game.table.clear()
+
+    # One below the shared best, so that a tie still gets an exact score
+    lower = max(alpha.value - 1, -mnk.WIN - 1)
+    try:
+        if position.play(move):
+            score = mnk.WIN - 1
+        else:
+            score = -game.negamax(position, depth - 1, -mnk.WIN - 1, -lower, 1)
+    except mnk.Timeout:
+        return None
+
+    with alpha.get_lock():
+        if score > alpha.value:
+            alpha.value = score
+    return score, game.stats["nodes"]
+
+
+def main():
+    if len(sys.argv) not in (5, 6):
+        sys.exit("Usage: python parallel.py m n k depth [workers]")
+    m, n, k, depth = map(int, sys.argv[1:5])
+    workers = int(sys.argv[5]) if len(sys.argv) == 6 else multiprocessing.cpu_count()
+    game = mnk.Game(m, n, k, budget=math.inf, max_depth=depth)
+    cells = [0] * game.size
+
+    start = time.perf_counter()
+    move, _ = game.search(cells)
+    base = time.perf_counter() - start
+    print(f"{m}x{n} k={k} depth {depth}, {multiprocessing.cpu_count()} CPUs")
+    print(f"{'workers':>7}{'seconds':>10}{'speed-up':>10}{'nodes':>10}  move")
+    print(f"{'seq':>7}{base:>10.3f}{1:>10.2f}{game.stats['nodes']:>10}  {divmod(move, n)}")
+
+    for count in range(1, workers + 1):
+        with RootParallel(game, count) as search:
+            start = time.perf_counter()
+            found, _ = search.search(cells, depth)
+            elapsed = time.perf_counter() - start
+            print(f"{count:>7}{elapsed:>10.3f}{base / elapsed:>10.2f}"
+                  f"{search.stats['nodes']:>10}  {divmod(found, n)}")
+        if found != move:
+            sys.exit(f"{count} workers chose {divmod(found, n)}, not {divmod(move, n)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Headless self-play for the tictactoe engines.
+
+Each engine variant plays a number of games against an opponent, half
+of them as X, and reports outcomes, nodes searched and per-move latency
+percentiles, so that variants can be compared side by side.
+
+Usage: python selfplay.py [--games N] [--opponent ENGINE] [--board M N K]
+                          [--budget SECONDS] [--seed S] ENGINE...
+"""
+
+import argparse
+import random
+import sys
+import time
+
+import bitboard
+import mnk
+import tictactoe as ttt
+
+# Engines that only play on 3x3 boards
+CLASSIC = ("book", "memoized", "alphabeta", "bitboard")
+
+ENGINES = CLASSIC + ("mnk", "random")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play tictactoe engines against each other.")
+    parser.add_argument("engines", nargs="+", choices=ENGINES, metavar="ENGINE",
+                        help=f"engine variants to compare: {', '.join(ENGINES)}")
+    parser.add_argument("--games", type=int, default=100,
+                        help="games per engine (default 100)")
+    parser.add_argument("--opponent", choices=ENGINES + ("self",), default="random",
+                        help="engine every variant plays against, or self (default random)")
+    parser.add_argument("--board", type=int, nargs=3, default=(3, 3, 3), metavar=("M", "N", "K"),
+                        help="board size and line length (default 3 3 3)")
+    parser.add_argument("--budget", type=float, default=0.1,
+                        help="seconds per move for the mnk engine (default 0.1)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed of the random player (default 0)")
+    args = parser.parse_args()
+    args.board = tuple(args.board)
+
+    game = mnk.Game(*args.board, budget=args.budget)
+    if args.board != (3, 3, 3):
+        classic = {args.opponent, *args.engines} & set(CLASSIC)
+        if classic:
+            sys.exit(f"{', '.join(sorted(classic))} only play 3x3 boards, use mnk")
+
+    print(f"{'engine':<10}{'games':>6}{'wins':>6}{'draws':>6}{'losses':>7}"
+          f"{'moves':>7}{'nodes/move':>11}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}")
+    for name in args.engines:
+        clear_caches(game)
+        rng = random.Random(args.seed)
+        engine = make_engine(name, game, rng)
+        opponent = engine if args.opponent == "self" else make_engine(args.opponent, game, rng)
+        report = play_games(game, engine, opponent, args.games)
+        latencies = sorted(report["latencies"])
+        moves = len(latencies)
+        print(f"{name:<10}{args.games:>6}{report['wins']:>6}{report['draws']:>6}"
+              f"{report['losses']:>7}{moves:>7}{report['nodes'] / max(moves, 1):>11.1f}"
+              f"{percentile(latencies, 50) * 1e3:>9.3f}"
+              f"{percentile(latencies, 90) * 1e3:>9.3f}"
+              f"{percentile(latencies, 99) * 1e3:>9.3f}")
+
+
+def make_engine(name, game, rng):
+    """
+    Returns (choose, stats) for an engine: a function from a board to an
+    action, and the dict in which it counts searched nodes.
+    """
+    if name == "book":
+        return ttt.minimax, ttt.stats
+    if name == "memoized":
+        return ttt.search, ttt.stats
+    if name == "alphabeta":
+        return ttt.alphabeta, ttt.stats
+    if name == "bitboard":
+        return bitboard.minimax, bitboard.stats
+    if name == "mnk":
+        return game.minimax, game.stats
+    return (lambda board: rng.choice(sorted(game.actions(board)))), {"nodes": 0}
+
+
+def clear_caches(game):
+    """
+    Forgets every engine's solved positions, so that each variant
+    starts cold.
+    """
+    ttt.transpositions.clear()
+    ttt.best_actions.clear()
+    bitboard.table.clear()
+    bitboard.best_moves.clear()
+    game.table.clear()
+
+
+def play_games(game, engine, opponent, games):
+    """
+    Plays `engine` against `opponent`, alternating who plays X, and
+    returns the outcomes for `engine` with its nodes and move latencies.
+    An engine playing itself wins when X wins and loses when O wins.
+    """
+    report = {"wins": 0, "draws": 0, "losses": 0, "nodes": 0, "latencies": []}
+    for number in range(games):
+        players = {ttt.X: engine, ttt.O: opponent} if number % 2 == 0 else {ttt.X: opponent, ttt.O: engine}
+        board = game.initial_state()
+        while not game.terminal(board):
+            turn = game.player(board)
+            choose, stats = players[turn]
+            stats["nodes"] = 0
+            start = time.perf_counter()
+            action = choose(board)
+            elapsed = time.perf_counter() - start
+            if players[turn] is engine:
+                report["latencies"].append(elapsed)
+                report["nodes"] += stats["nodes"]
+            board = game.result(board, action)
+
+        winner = game.winner(board)
+        if winner is None:
+            report["draws"] += 1
+        elif players[winner] is engine and (opponent is not engine or winner == ttt.X):
+            report["wins"] += 1
+        else:
+            report["losses"] += 1
+    return report
+
+
+def percentile(values, p):
+    """
+    Returns the nearest-rank `p`th percentile of sorted `values`.
+    """
+    if not values:
+        return 0.0
+    return values[max(0, -(-len(values) * p // 100) - 1)]
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,41 @@
 Tic Tac Toe Player
 """
 
-import math
-import copy
+import os
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# The 8 winning lines, as indexes into the row-major cells of a board
+LINES = [(0, 1, 2), (3, 4, 5), (6, 7, 8),
+         (0, 3, 6), (1, 4, 7), (2, 5, 8),
+         (0, 4, 8), (2, 4, 6)]
+
+# The 8 rotations and reflections of the board, as cell permutations
+SYMMETRIES = [(0, 1, 2, 3, 4, 5, 6, 7, 8), (6, 3, 0, 7, 4, 1, 8, 5, 2),
+              (8, 7, 6, 5, 4, 3, 2, 1, 0), (2, 5, 8, 1, 4, 7, 0, 3, 6),
+              (2, 1, 0, 5, 4, 3, 8, 7, 6), (0, 3, 6, 1, 4, 7, 2, 5, 8),
+              (6, 7, 8, 3, 4, 5, 0, 1, 2), (8, 5, 2, 7, 4, 1, 6, 3, 0)]
+
+# Minimax value of positions already solved, keyed by canonical encoding
+transpositions = {}
+
+# Optimal action of positions already asked about, keyed by encoding
+best_actions = {}
+
+# Search counters, reset by callers that want to measure a search
+stats = {"nodes": 0}
+
+# Optimal move of every position, as written by book.py: one byte per
+# base-3 encoding of the board, holding the cell index or NO_MOVE
+BOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+BOOK_SIZE = 3 ** 9
+NO_MOVE = 255
+
+# The book, read on first use; empty if there is no book file
+book = None
+
 
 def initial_state():
     """
@@ -56,8 +84,8 @@ def result(board, action):
     if not (action[0] in [0, 1, 2] and action[1] in [0, 1, 2]):
         raise Exception
 
-    new_board = copy.deepcopy(board)
-    new_board[action[0]][action[1]] = player(new_board)
+    new_board = [row[:] for row in board]
+    new_board[action[0]][action[1]] = player(board)
     return new_board
 
 
@@ -126,8 +154,118 @@ def minimax(board):
     """
     if terminal(board):
         return None
-    
+
+    book = load_book()
+    if book and book[book_index(board)] != NO_MOVE:
+        return divmod(book[book_index(board)], 3)
+    return search(board)
+
+
+def search(board):
+    """
+    Returns the optimal action for the current player on a board that
+    is not terminal, solving it with the memoized search.
+    """
+    cells = encode(board)
+    if cells in best_actions:
+        return best_actions[cells]
+
+    turn = player(board)
+    best_action = best_value = None
+    for i in range(9):
+        if cells[i] != ".":
+            continue
+        value = solve(cells[:i] + turn + cells[i + 1:])
+        if (best_value is None or
+                (value > best_value if turn == X else value < best_value)):
+            best_action, best_value = divmod(i, 3), value
+
+    best_actions[cells] = best_action
+    return best_action
+
+
+def load_book():
+    """
+    Returns the opening book, reading it on the first call.
+    """
+    global book
+    if book is None:
+        try:
+            with open(BOOK, "rb") as f:
+                book = f.read()
+        except OSError:
+            book = b""
+        if len(book) != BOOK_SIZE:
+            book = b""
+    return book
+
+
+def book_index(board):
+    """
+    Returns the board read as a base-3 number, with empty cells as 0,
+    X as 1 and O as 2.
+    """
+    index = 0
+    for row in board:
+        for cell in row:
+            index = index * 3 + (1 if cell == X else 2 if cell == O else 0)
+    return index
+
+
+def encode(board):
+    """
+    Returns the board as a 9-character string, "." for empty cells.
+    """
+    return "".join(cell or "." for row in board for cell in row)
+
+
+def canonical(cells):
+    """
+    Returns the smallest encoding among the 8 symmetries of `cells`,
+    so that equivalent positions share one transposition table entry.
+    """
+    return min("".join([cells[i] for i in symmetry]) for symmetry in SYMMETRIES)
+
+
+def solve(cells):
+    """
+    Returns the minimax value (1, 0 or -1) of an encoded position,
+    memoized on its canonical encoding.
+    """
+    key = canonical(cells)
+    value = transpositions.get(key)
+    if value is not None:
+        return value
+
+    stats["nodes"] += 1
+    value = None
+    for a, b, c in LINES:
+        if cells[a] != "." and cells[a] == cells[b] == cells[c]:
+            value = 1 if cells[a] == X else -1
+            break
+    else:
+        if "." not in cells:
+            value = 0
+        else:
+            turn = O if cells.count(X) > cells.count(O) else X
+            children = (solve(cells[:i] + turn + cells[i + 1:])
+                        for i in range(9) if cells[i] == ".")
+            value = max(children) if turn == X else min(children)
+
+    transpositions[key] = value
+    return value
+
+
+def alphabeta(board):
+    """
+    Returns the optimal action for the current player on the board,
+    searching the game tree from scratch with alpha-beta pruning.
+    """
+    if terminal(board):
+        return None
+
     def maxValue(_board, curr_min):
+        stats["nodes"] += 1
         curr_max = -1
         curr_action = None
         _actions = actions(_board)
@@ -148,6 +286,7 @@ def minimax(board):
         return (curr_max, curr_action)
 
     def minValue(_board, curr_max):
+        stats["nodes"] += 1
         curr_min = 1
         curr_action = None
         _actions = actions(_board)